@@ -1,36 +1,95 @@
 from langchain.tools import Tool
-from langchain.agents import create_react_agent, AgentExecutor
-from langchain.prompts import PromptTemplate
-from langchain_community.llms import Ollama
-from typing import Optional, Type, Dict, Any
+from typing import Optional, Type, Dict, Any, Tuple, List, Final, TYPE_CHECKING
+from dataclasses import dataclass
+import functools
+import importlib.util
 import json
+import os
+import re
+import threading
+import time
+
+import numpy as np
 
 from data_loader import FacultyDataLoader
-from vector_store import PolicyVectorStore
+from vector_store import PolicyVectorStore, RandomEmbedder
+
+# sentence-transformers (and torch) load lazily; only check that they are installed
+HAS_SENTENCE_TRANSFORMERS = importlib.util.find_spec("sentence_transformers") is not None
+
+# Print the ReAct Thought/Action trace only when FWA_VERBOSE=1
+_VERBOSE = os.getenv("FWA_VERBOSE", "0") == "1"
+# Run LangChain callbacks (tracing uploads) without blocking invoke(), unless configured otherwise
+os.environ.setdefault("LANGCHAIN_CALLBACKS_BACKGROUND", "true")
+
+if TYPE_CHECKING:
+    from langchain.prompts import PromptTemplate
+    from langchain_community.llms import Ollama
+
+# Lookup tables shared by the query parsers; lists are in priority order
+_DAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+_DEPARTMENTS = ['cse', 'eee', 'me', 'civil', 'ece', 'it']
+_DAY_RANK = {day: rank for rank, day in enumerate(_DAYS)}
+_DEPARTMENT_RANK = {dept: rank for rank, dept in enumerate(_DEPARTMENTS)}
+# Codes that are also everyday words ("tell me", "is it"); they only name a department
+# when written in capitals or next to "department"/"dept"
+_AMBIGUOUS_DEPARTMENTS = frozenset({'me', 'it'})
+_DEPARTMENT_CODE_RE = re.compile(r"\b(?:" + "|".join(_DEPARTMENTS) + r")\b", re.IGNORECASE)
+_DEPT_WORD_AFTER_RE = re.compile(r"\s+(?:department|dept)\b", re.IGNORECASE)
+_DEPT_WORD_BEFORE_RE = re.compile(r"\b(?:department|dept)\.?\s+(?:of\s+)?$", re.IGNORECASE)
+
+# "Prof. Sharma's", "Prof.Sharma" and "Professor Sharma" all name Sharma; apostrophes and
+# hyphens inside a name ("O'Brien", "Rao-Iyer") are kept, a possessive "'s" is not
+_PROF_PATTERN = r"\bprof(?:essor\s+|\.\s*)(?P<faculty>[a-z]+(?:-[a-z]+|'(?!s\b)[a-z]+)*)"
+_PROF_RE = re.compile(_PROF_PATTERN, re.IGNORECASE)
+
+def _faculty_name(word: str) -> str:
+    """Format a captured surname the way the CSVs store it, e.g. "sharma" -> "Prof.Sharma"."""
+    return "Prof." + word.title()
+
+def _is_explicit_department(query: str, match: "re.Match") -> bool:
+    """Whether a matched department code is capitalized or next to "department"/"dept"."""
+    return (match.group().isupper()
+            or _DEPT_WORD_AFTER_RE.match(query, match.end()) is not None
+            or _DEPT_WORD_BEFORE_RE.search(query, 0, match.start()) is not None)
 
-# Global variables to store the instances
-_vector_store = None
-_data_loader = None
+def _has_explicit_department(query: str) -> bool:
+    """Whether the query names a department explicitly, e.g. "CSE" or "cse department"."""
+    return any(_is_explicit_department(query, match) for match in _DEPARTMENT_CODE_RE.finditer(query))
+
+def _extract_faculty(query: str) -> Optional[str]:
+    """Return the first faculty member named in a query as "Prof.<Name>", if any."""
+    match = _PROF_RE.search(query)
+    return _faculty_name(match.group('faculty')) if match else None
+
+@dataclass(frozen=True)
+class ParsedQuery:
+    """A tool query lowercased and tokenized once, shared by the handler helpers."""
+    raw: str
+    lower: str
+    words: List[str]
+    
+    @classmethod
+    def parse(cls, query: str) -> "ParsedQuery":
+        lower = query.lower()
+        return cls(raw=query, lower=lower, words=lower.split())
 
 def create_rag_policy_tool(vector_store: PolicyVectorStore):
     """Create RAG policy tool."""
-    global _vector_store
-    _vector_store = vector_store
-    
     def rag_policy_search(query: str) -> str:
         """Search for university policies using RAG."""
         try:
-            results = _vector_store.search_policies(query, n_results=3)
+            results = vector_store.query_cache.search(query, n_results=3)
             
             if not results:
                 return "No relevant policies found for your query."
             
-            response = "Relevant policies found:\n\n"
+            parts = ["Relevant policies found:\n\n"]
             for i, result in enumerate(results, 1):
-                response += f"{i}. {result['text']}\n"
-                response += f"   Category: {result['metadata']['category']}\n\n"
+                parts.append(f"{i}. {result['text']}\n")
+                parts.append(f"   Category: {result['metadata']['category']}\n\n")
             
-            return response
+            return ''.join(parts)
             
         except Exception as e:
             return f"Error searching policies: {str(e)}"
@@ -43,26 +102,24 @@ def create_rag_policy_tool(vector_store: PolicyVectorStore):
 
 def create_timetable_query_tool(data_loader: FacultyDataLoader):
     """Create timetable query tool."""
-    global _data_loader
-    _data_loader = data_loader
-    
     def timetable_query(query: str) -> str:
         """Execute the timetable query."""
         try:
-            query_lower = query.lower()
+            pq = ParsedQuery.parse(query)
+            query_lower = pq.lower
             
             if "free" in query_lower and ("faculty" in query_lower or "professor" in query_lower):
-                return _handle_free_faculty_query(query)
+                return _handle_free_faculty_query(data_loader, pq)
             elif "room" in query_lower and ("allocated" in query_lower or "allotted" in query_lower):
-                return _handle_room_allocation_query(query)
+                return _handle_room_allocation_query(data_loader, pq)
             elif "schedule" in query_lower or "timetable" in query_lower:
-                return _handle_schedule_query(query)
+                return _handle_schedule_query(data_loader, pq)
             elif "room" in query_lower:
-                return _handle_room_query(query)
+                return _handle_room_query(data_loader, pq)
             elif "course" in query_lower:
-                return _handle_course_query(query)
+                return _handle_course_query(data_loader, pq)
             else:
-                return _handle_general_query(query)
+                return _handle_general_query(data_loader, pq)
                 
         except Exception as e:
             return f"Error processing timetable query: {str(e)}"
@@ -75,22 +132,20 @@ def create_timetable_query_tool(data_loader: FacultyDataLoader):
 
 def create_workload_report_tool(data_loader: FacultyDataLoader):
     """Create workload report tool."""
-    global _data_loader
-    _data_loader = data_loader
-    
     def workload_report(query: str) -> str:
         """Execute the workload report generation."""
         try:
-            query_lower = query.lower()
+            pq = ParsedQuery.parse(query)
+            query_lower = pq.lower
             
             if "department" in query_lower:
-                return _handle_department_query(query)
+                return _handle_department_query(data_loader, pq)
             elif "prof" in query_lower or "professor" in query_lower:
-                return _handle_faculty_query(query)
+                return _handle_faculty_query(data_loader, pq)
             elif "all" in query_lower and "faculty" in query_lower:
-                return _handle_all_faculty_query(query)
+                return _handle_all_faculty_query(data_loader, pq)
             else:
-                return _handle_general_workload_query(query)
+                return _handle_general_workload_query(data_loader, pq)
                 
         except Exception as e:
             return f"Error generating workload report: {str(e)}"
@@ -102,18 +157,16 @@ def create_workload_report_tool(data_loader: FacultyDataLoader):
     )
 
 # Helper functions for timetable queries
-def _handle_free_faculty_query(query: str) -> str:
+def _handle_free_faculty_query(data_loader: FacultyDataLoader, pq: ParsedQuery) -> str:
     """Handle queries about free faculty at specific times."""
     # Extract day and time from query
-    words = query.lower().split()
+    words = pq.words
     day = None
     time = None
     
-    days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-    for word in words:
-        if word in days:
-            day = word.capitalize()
-            break
+    day_word = next((word for word in words if word in _DAY_RANK), None)
+    if day_word:
+        day = day_word.capitalize()
     
     # Look for time patterns
     for i, word in enumerate(words):
@@ -133,79 +186,67 @@ def _handle_free_faculty_query(query: str) -> str:
     if not day or not time:
         return "Please specify both day and time (e.g., 'faculty free on Tuesday at 2 PM')"
     
-    result = _data_loader.get_free_faculty(day, time)
+    result = data_loader.get_free_faculty(day, time)
     
     if "error" in result:
         return result["error"]
     
-    response = f"Free faculty on {result['day']} at {result['time']}:\n\n"
-    response += f"Available faculty ({len(result['free_faculty'])}):\n"
+    parts = [f"Free faculty on {result['day']} at {result['time']}:\n\n"]
+    parts.append(f"Available faculty ({len(result['free_faculty'])}):\n")
     for faculty in result['free_faculty']:
-        response += f"- {faculty}\n"
+        parts.append(f"- {faculty}\n")
     
     if result['busy_faculty']:
-        response += f"\nBusy faculty ({len(result['busy_faculty'])}):\n"
+        parts.append(f"\nBusy faculty ({len(result['busy_faculty'])}):\n")
         for faculty in result['busy_faculty']:
-            response += f"- {faculty['name']} (teaching {faculty['course']} in {faculty['room']})\n"
+            parts.append(f"- {faculty['name']} (teaching {faculty['course']} in {faculty['room']})\n")
     
-    return response
+    return ''.join(parts)
 
-def _handle_schedule_query(query: str) -> str:
+def _handle_schedule_query(data_loader: FacultyDataLoader, pq: ParsedQuery) -> str:
     """Handle queries about faculty schedules."""
     # Extract faculty name and day from query
-    words = query.lower().split()
-    faculty_name = None
+    words = pq.words
+    faculty_name = _extract_faculty(pq.lower)
     day = None
     
-    # Look for "Prof." or "Professor"
-    for i, word in enumerate(words):
-        if word in ['prof.', 'professor'] and i + 1 < len(words):
-            # Remove any punctuation from the name
-            name_part = words[i + 1].replace("'s", "").replace("'", "").replace(".", "")
-            faculty_name = "Prof." + name_part.capitalize()
-            break
-    
-    days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-    for word in words:
-        if word in days:
-            day = word.capitalize()
-            break
+    day_word = next((word for word in words if word in _DAY_RANK), None)
+    if day_word:
+        day = day_word.capitalize()
     
     if not faculty_name:
         return "Please specify a faculty member (e.g., 'Prof. Sharma schedule')"
     
     if day:
-        result = _data_loader.get_faculty_schedule(faculty_name, day)
+        result = data_loader.get_faculty_schedule(faculty_name, day)
     else:
-        # Get schedule for all days
-        all_days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
-        response = f"Schedule for {faculty_name}:\n\n"
-        for d in all_days:
-            result = _data_loader.get_faculty_schedule(faculty_name, d)
-            if "sessions" in result and result["sessions"]:
-                response += f"{d}:\n"
-                for session in result["sessions"]:
-                    response += f"  {session['time']} - {session['course']} ({session['room']})\n"
-                response += "\n"
-        return response
+        # Get schedule for all days in one pass
+        week = data_loader.get_faculty_schedule_week(faculty_name)
+        parts = [f"Schedule for {faculty_name}:\n\n"]
+        for d, sessions in week.items():
+            parts.append(f"{d}:\n")
+            for session in sessions:
+                parts.append(f"  {session['time']} - {session['course']} ({session['room']})\n")
+            parts.append("\n")
+        return ''.join(parts)
     
     if "error" in result:
         return result["error"]
     
-    response = f"Schedule for {result['name']} on {result['day']}:\n\n"
+    parts = [f"Schedule for {result['name']} on {result['day']}:\n\n"]
     if result['sessions']:
         for session in result['sessions']:
-            response += f"- {session['time']}: {session['course']} ({session['room']})\n"
+            parts.append(f"- {session['time']}: {session['course']} ({session['room']})\n")
     else:
-        response += "No classes scheduled.\n"
+        parts.append("No classes scheduled.\n")
     
-    return response
+    return ''.join(parts)
 
 
-def _handle_room_query(query: str) -> str:
+def _handle_room_query(data_loader: FacultyDataLoader, pq: ParsedQuery) -> str:
     """Handle queries about room availability."""
     # Extract room number from query
-    words = query.lower().split()
+    words = pq.words
     room = None
     
     for word in words:
@@ -216,24 +257,24 @@ def _handle_room_query(query: str) -> str:
     if not room:
         return "Please specify a room (e.g., 'room 201 availability')"
     
-    result = _data_loader.get_room_schedule(room)
+    result = data_loader.get_room_schedule(room)
     
     if "error" in result:
         return result["error"]
     
-    response = f"Schedule for {result['room']}:\n\n"
+    parts = [f"Schedule for {result['room']}:\n\n"]
     if result['sessions']:
         for session in result['sessions']:
-            response += f"- {session['day']} {session['time']}: {session['course']} (Prof. {session['faculty']})\n"
+            parts.append(f"- {session['day']} {session['time']}: {session['course']} (Prof. {session['faculty']})\n")
     else:
-        response += "No classes scheduled in this room.\n"
+        parts.append("No classes scheduled in this room.\n")
     
-    return response
+    return ''.join(parts)
 
-def _handle_course_query(query: str) -> str:
+def _handle_course_query(data_loader: FacultyDataLoader, pq: ParsedQuery) -> str:
     """Handle queries about courses."""
     # Extract course name from query
-    words = query.lower().split()
+    words = pq.words
     course_name = None
     
     # Look for course-related keywords
@@ -246,40 +287,25 @@ def _handle_course_query(query: str) -> str:
     if not course_name:
         return "Please specify a course name (e.g., 'Data Structures course')"
     
-    results = _data_loader.search_faculty_by_course(course_name)
+    results = data_loader.search_faculty_by_course(course_name)
     
     if "error" in results:
         return results["error"]
     
-    response = f"Faculty teaching {course_name}:\n\n"
+    parts = [f"Faculty teaching {course_name}:\n\n"]
     for result in results:
-        response += f"- {result['name']} ({result['department']}) - {result['hours_per_week']} hours/week\n"
+        parts.append(f"- {result['name']} ({result['department']}) - {result['hours_per_week']} hours/week\n")
     
-    return response
+    return ''.join(parts)
 
-def _handle_room_allocation_query(query: str) -> str:
+def _handle_room_allocation_query(data_loader: FacultyDataLoader, pq: ParsedQuery) -> str:
     """Handle queries about room allocation for specific faculty."""
-    words = query.lower().split()
-    faculty_name = None
+    query_lower = pq.lower
+    faculty_name = _extract_faculty(query_lower)
     day = None
     
-    # Look for "Prof." or "Professor" - improved matching
-    query_lower = query.lower()
-    if 'prof.' in query_lower:
-        # Find the position of "prof."
-        prof_pos = query_lower.find('prof.')
-        if prof_pos != -1:
-            # Extract the name after "prof."
-            after_prof = query_lower[prof_pos + 5:].strip()
-            # Get the first word after "prof."
-            name_parts = after_prof.split()
-            if name_parts:
-                name_part = name_parts[0].replace("'s", "").replace("'", "").replace(".", "")
-                faculty_name = "Prof." + name_part.capitalize()
-    
     # Look for day - improved matching
-    days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-    for day_name in days:
+    for day_name in _DAYS:
         if day_name in query_lower:
             day = day_name.capitalize()
             break
@@ -291,19 +317,61 @@ def _handle_room_allocation_query(query: str) -> str:
         return "Please specify a day (e.g., 'which room is allocated Prof. Sharma on Monday')"
     
     # Get faculty schedule for the specific day
-    result = _data_loader.get_faculty_schedule(faculty_name, day)
+    result = data_loader.get_faculty_schedule(faculty_name, day)
     
     if "error" in result:
         return result["error"]
     
     if result['sessions']:
-        response = f"Room allocation for {faculty_name} on {day}:\n\n"
+        parts = [f"Room allocation for {faculty_name} on {day}:\n\n"]
         for session in result['sessions']:
-            response += f"- {session['time']}: {session['room']} (teaching {session['course']})\n"
+            parts.append(f"- {session['time']}: {session['room']} (teaching {session['course']})\n")
     else:
-        response = f"{faculty_name} has no classes scheduled on {day}.\n"
+        parts = [f"{faculty_name} has no classes scheduled on {day}.\n"]
     
-    return response
+    return ''.join(parts)
+
+# Intent keywords in priority order: when a query mentions keywords of several
+# intents, the intent listed first wins.
+_INTENT_KEYWORDS = [
+    ("room_allocation", ['room', 'allocated', 'allotted', 'assigned']),
+    ("faculty_schedule", ['schedule', 'timetable', 'when', 'time']),
+    ("workload_inquiry", ['workload', 'hours', 'teaching', 'courses']),
+    ("policy_search", ['policy', 'rule', 'regulation', 'guideline']),
+    ("availability_check", ['free', 'available', 'busy']),
+]
+_KEYWORD_RANK = {word: rank for rank, (_, words) in enumerate(_INTENT_KEYWORDS) for word in words}
+# Zero-width lookahead so overlapping keywords (e.g. "time" in "timetable") are all seen
+_INTENT_RE = re.compile("(?=(" + "|".join(map(re.escape, _KEYWORD_RANK)) + "))")
+
+def _matched_intents(query_lower: str) -> set:
+    """Every intent with at least one keyword in the (lowercased) query."""
+    return {_INTENT_KEYWORDS[_KEYWORD_RANK[match.group(1)]][0] for match in _INTENT_RE.finditer(query_lower)}
+
+# Every context field in one alternation, dispatched on the named group that matched
+_CONTEXT_RE = re.compile(
+    _PROF_PATTERN +
+    r"|room\s*(?P<room>\d+)"
+    r"|(?P<day>" + "|".join(_DAYS) + r")"
+    r"|(?P<time>\b\d{1,2}(?::\d{2}\s*(?:am|pm)?|\s*(?:am|pm))\b)"
+    r"|\b(?P<department>" + "|".join(_DEPARTMENTS) + r")\b",
+    re.IGNORECASE
+)
+
+# Response headers for the intelligent workload reports
+_WORKLOAD_HEADER: Final[str] = (
+    "Here's {faculty}'s teaching workload:\n\n"
+    "📊 **Total Hours**: {hours} hours per week\n"
+    "🏢 **Department**: {department}\n\n"
+    "📚 **Courses Teaching**:\n"
+)
+_DEPARTMENT_HEADER: Final[str] = (
+    "Here's the workload summary for the {department} department:\n\n"
+    "👥 **Total Faculty**: {faculty_count}\n"
+    "⏰ **Total Teaching Hours**: {hours} hours/week\n"
+    "📊 **Average Hours per Faculty**: {average:.1f} hours/week\n\n"
+    "👨‍🏫 **Faculty Details**:\n"
+)
 
 class IntelligentQueryProcessor:
     """Enhanced query processor that thinks more like a human."""
@@ -318,7 +386,7 @@ class IntelligentQueryProcessor:
         
         # Analyze query intent and context
         intent = self._analyze_intent(query_lower)
-        context = self._extract_context(query_lower)
+        context = self._extract_context(query.strip())
         
         # Generate intelligent response based on intent and context
         if intent == "room_allocation":
@@ -336,21 +404,20 @@ class IntelligentQueryProcessor:
     
     def _analyze_intent(self, query: str) -> str:
         """Analyze the user's intent from the query."""
-        if any(word in query for word in ['room', 'allocated', 'allotted', 'assigned']):
-            return "room_allocation"
-        elif any(word in query for word in ['schedule', 'timetable', 'when', 'time']):
-            return "faculty_schedule"
-        elif any(word in query for word in ['workload', 'hours', 'teaching', 'courses']):
-            return "workload_inquiry"
-        elif any(word in query for word in ['policy', 'rule', 'regulation', 'guideline']):
-            return "policy_search"
-        elif any(word in query for word in ['free', 'available', 'busy']):
-            return "availability_check"
-        else:
-            return "general"
+        best = len(_INTENT_KEYWORDS)
+        for match in _INTENT_RE.finditer(query):
+            rank = _KEYWORD_RANK[match.group(1)]
+            if rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        
+        if best < len(_INTENT_KEYWORDS):
+            return _INTENT_KEYWORDS[best][0]
+        return "general"
     
     def _extract_context(self, query: str) -> dict:
-        """Extract contextual information from the query."""
+        """Extract contextual information from the query (original casing, so "IT" differs from "it")."""
         context = {
             'faculty': None,
             'day': None,
@@ -359,47 +426,36 @@ class IntelligentQueryProcessor:
             'department': None,
             'course': None
         }
+        day_rank = len(_DAYS)
+        dept_rank = len(_DEPARTMENTS)
         
-        # Extract faculty name
-        if 'prof.' in query:
-            prof_pos = query.find('prof.')
-            after_prof = query[prof_pos + 5:].strip()
-            name_parts = after_prof.split()
-            if name_parts:
-                name_part = name_parts[0].replace("'s", "").replace("'", "").replace(".", "")
-                context['faculty'] = "Prof." + name_part.capitalize()
-        
-        # Extract day
-        days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-        for day in days:
-            if day in query:
-                context['day'] = day.capitalize()
-                break
-        
-        # Extract time
-        import re
-        time_patterns = [
-            r'\d{1,2}:\d{2}',  # 09:00, 14:30
-            r'\d{1,2}\s*(am|pm)',  # 9 am, 2 pm
-            r'\d{1,2}\s*(am|pm)',  # 9am, 2pm
-        ]
-        for pattern in time_patterns:
-            match = re.search(pattern, query)
-            if match:
-                context['time'] = match.group()
-                break
-        
-        # Extract room
-        room_match = re.search(r'room\s*(\d+)', query)
-        if room_match:
-            context['room'] = f"Room {room_match.group(1)}"
-        
-        # Extract department
-        departments = ['cse', 'eee', 'me', 'civil', 'ece', 'it']
-        for dept in departments:
-            if dept in query:
-                context['department'] = dept.upper()
-                break
+        # Single pass over the query; the first faculty, time and room mentioned
+        # win, while days and departments keep the priority order of their lists
+        for match in _CONTEXT_RE.finditer(query):
+            field = match.lastgroup
+            value = match.group(field).lower()
+            
+            if field == 'faculty':
+                if not context['faculty']:
+                    context['faculty'] = _faculty_name(value)
+            elif field == 'day':
+                rank = _DAY_RANK[value]
+                if rank < day_rank:
+                    day_rank = rank
+                    context['day'] = value.capitalize()
+            elif field == 'time':
+                if not context['time']:
+                    context['time'] = value
+            elif field == 'room':
+                if not context['room']:
+                    context['room'] = f"Room {value}"
+            elif field == 'department':
+                if value in _AMBIGUOUS_DEPARTMENTS and not _is_explicit_department(query, match):
+                    continue
+                rank = _DEPARTMENT_RANK[value]
+                if rank < dept_rank:
+                    dept_rank = rank
+                    context['department'] = value.upper()
         
         return context
     
@@ -413,20 +469,22 @@ class IntelligentQueryProcessor:
         if "error" in result:
             return f"I couldn't find any classes for {context['faculty']} on {context['day']}. They might be free that day or the information might not be available."
         
-        if result['sessions']:
-            response = f"Based on the schedule, {context['faculty']} is allocated the following rooms on {context['day']}:\n\n"
-            for session in result['sessions']:
-                response += f"• {session['time']}: {session['room']} (teaching {session['course']})\n"
+        sessions = result['sessions']
+        if sessions:
+            parts = [f"Based on the schedule, {context['faculty']} is allocated the following rooms on {context['day']}:\n\n"]
+            append = parts.append
+            for session in sessions:
+                append(f"• {session['time']}: {session['room']} (teaching {session['course']})\n")
             
             # Add helpful context
-            if len(result['sessions']) == 1:
-                response += f"\n{context['faculty']} has only one class on {context['day']}."
+            if len(sessions) == 1:
+                append(f"\n{context['faculty']} has only one class on {context['day']}.")
             else:
-                response += f"\n{context['faculty']} has {len(result['sessions'])} classes scheduled on {context['day']}."
+                append(f"\n{context['faculty']} has {len(sessions)} classes scheduled on {context['day']}.")
         else:
-            response = f"{context['faculty']} doesn't have any classes scheduled on {context['day']}. They're free that day!"
+            parts = [f"{context['faculty']} doesn't have any classes scheduled on {context['day']}. They're free that day!"]
         
-        return response
+        return ''.join(parts)
     
     def _handle_faculty_schedule_intelligent(self, query: str, context: dict) -> str:
         """Handle faculty schedule queries with intelligence."""
@@ -438,31 +496,30 @@ class IntelligentQueryProcessor:
             if "error" in result:
                 return f"I don't see any classes scheduled for {context['faculty']} on {context['day']}."
             
-            response = f"Here's {context['faculty']}'s schedule for {context['day']}:\n\n"
-            if result['sessions']:
-                for session in result['sessions']:
-                    response += f"• {session['time']}: {session['course']} in {session['room']}\n"
+            parts = [f"Here's {context['faculty']}'s schedule for {context['day']}:\n\n"]
+            sessions = result['sessions']
+            if sessions:
+                append = parts.append
+                for session in sessions:
+                    append(f"• {session['time']}: {session['course']} in {session['room']}\n")
             else:
-                response += "No classes scheduled - they're free that day!"
+                parts.append("No classes scheduled - they're free that day!")
         else:
             # Get full week schedule
-            response = f"Here's {context['faculty']}'s weekly schedule:\n\n"
-            days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
-            has_classes = False
+            parts = [f"Here's {context['faculty']}'s weekly schedule:\n\n"]
+            week = self.data_loader.get_faculty_schedule_week(context['faculty'])
             
-            for day in days:
-                result = self.data_loader.get_faculty_schedule(context['faculty'], day)
-                if result.get('sessions'):
-                    has_classes = True
-                    response += f"{day}:\n"
-                    for session in result['sessions']:
-                        response += f"  • {session['time']}: {session['course']} in {session['room']}\n"
-                    response += "\n"
+            append = parts.append
+            for day, sessions in week.items():
+                append(f"{day}:\n")
+                for session in sessions:
+                    append(f"  • {session['time']}: {session['course']} in {session['room']}\n")
+                append("\n")
             
-            if not has_classes:
-                response += "No classes scheduled for this faculty member."
+            if not week:
+                parts.append("No classes scheduled for this faculty member.")
         
-        return response
+        return ''.join(parts)
     
     def _handle_workload_inquiry_intelligent(self, query: str, context: dict) -> str:
         """Handle workload inquiries with intelligent analysis."""
@@ -471,56 +528,55 @@ class IntelligentQueryProcessor:
             if "error" in result:
                 return f"I couldn't find workload information for {context['faculty']}."
             
-            response = f"Here's {context['faculty']}'s teaching workload:\n\n"
-            response += f"📊 **Total Hours**: {result['total_hours']} hours per week\n"
-            response += f"🏢 **Department**: {result['department']}\n\n"
-            response += "📚 **Courses Teaching**:\n"
+            parts = [_WORKLOAD_HEADER.format(faculty=context['faculty'], hours=result['total_hours'], department=result['department'])]
             
+            append = parts.append
             for course in result['course_details']:
-                response += f"• {course['course']}: {course['hours_per_week']} hours/week\n"
+                append(f"• {course['course']}: {course['hours_per_week']} hours/week\n")
             
             # Add intelligent analysis
             if result['total_hours'] > 10:
-                response += f"\n💡 **Note**: {context['faculty']} has a heavy teaching load ({result['total_hours']} hours)."
+                parts.append(f"\n💡 **Note**: {context['faculty']} has a heavy teaching load ({result['total_hours']} hours).")
             elif result['total_hours'] < 6:
-                response += f"\n💡 **Note**: {context['faculty']} has a light teaching load ({result['total_hours']} hours)."
+                parts.append(f"\n💡 **Note**: {context['faculty']} has a light teaching load ({result['total_hours']} hours).")
             else:
-                response += f"\n💡 **Note**: {context['faculty']} has a balanced teaching load ({result['total_hours']} hours)."
+                parts.append(f"\n💡 **Note**: {context['faculty']} has a balanced teaching load ({result['total_hours']} hours).")
         
         elif context['department']:
             result = self.data_loader.get_department_summary(context['department'])
             if "error" in result:
                 return f"I couldn't find information for the {context['department']} department."
             
-            response = f"Here's the workload summary for the {context['department']} department:\n\n"
-            response += f"👥 **Total Faculty**: {result['total_faculty']}\n"
-            response += f"⏰ **Total Teaching Hours**: {result['total_hours']} hours/week\n"
-            response += f"📊 **Average Hours per Faculty**: {result['total_hours'] / result['total_faculty']:.1f} hours/week\n\n"
-            
-            response += "👨‍🏫 **Faculty Details**:\n"
+            parts = [_DEPARTMENT_HEADER.format(
+                department=context['department'],
+                faculty_count=result['total_faculty'],
+                hours=result['total_hours'],
+                average=result['total_hours'] / result['total_faculty']
+            )]
+            append = parts.append
             for faculty in result['faculty_details']:
-                response += f"• {faculty['name']}: {faculty['courses']} ({faculty['hours_per_week']} hours/week)\n"
+                append(f"• {faculty['name']}: {faculty['courses']} ({faculty['hours_per_week']} hours/week)\n")
         
         else:
             return "I'd be happy to help with workload information! Please specify either a faculty member (e.g., 'Prof. Sharma workload') or a department (e.g., 'CSE department workload')."
         
-        return response
+        return ''.join(parts)
     
     def _handle_policy_search_intelligent(self, query: str, context: dict) -> str:
         """Handle policy searches with intelligent responses."""
-        results = self.vector_store.search_policies(query, n_results=3)
+        results = self.vector_store.query_cache.search(query, n_results=3)
         
         if not results:
             return "I couldn't find any policies related to your query. The policy database might not contain information about this topic."
         
-        response = "Here are the relevant university policies:\n\n"
+        parts = ["Here are the relevant university policies:\n\n"]
         for i, result in enumerate(results, 1):
-            response += f"**{i}. {result['metadata']['category'].replace('_', ' ').title()}**\n"
-            response += f"{result['text']}\n\n"
+            parts.append(f"**{i}. {result['metadata']['category'].replace('_', ' ').title()}**\n")
+            parts.append(f"{result['text']}\n\n")
         
-        response += "💡 **Tip**: These policies are guidelines for faculty workload and scheduling. If you need more specific information, please ask!"
+        parts.append("💡 **Tip**: These policies are guidelines for faculty workload and scheduling. If you need more specific information, please ask!")
         
-        return response
+        return ''.join(parts)
     
     def _handle_availability_check_intelligent(self, query: str, context: dict) -> str:
         """Handle availability checks with intelligent responses."""
@@ -529,25 +585,29 @@ class IntelligentQueryProcessor:
         
         result = self.data_loader.get_free_faculty(context['day'], context['time'])
         
-        response = f"Here's the faculty availability for {context['day']} at {context['time']}:\n\n"
+        parts = [f"Here's the faculty availability for {context['day']} at {context['time']}:\n\n"]
         
-        if result['free_faculty']:
-            response += f"✅ **Available Faculty** ({len(result['free_faculty'])}):\n"
-            for faculty in result['free_faculty']:
-                response += f"• {faculty}\n"
+        append = parts.append
+        free_faculty = result['free_faculty']
+        busy_faculty = result['busy_faculty']
+        
+        if free_faculty:
+            append(f"✅ **Available Faculty** ({len(free_faculty)}):\n")
+            for faculty in free_faculty:
+                append(f"• {faculty}\n")
         else:
-            response += "❌ **No faculty available** at this time.\n"
+            append("❌ **No faculty available** at this time.\n")
         
-        if result['busy_faculty']:
-            response += f"\n🚫 **Busy Faculty** ({len(result['busy_faculty'])}):\n"
-            for faculty in result['busy_faculty']:
-                response += f"• {faculty['name']} (teaching {faculty['course']} in {faculty['room']})\n"
+        if busy_faculty:
+            append(f"\n🚫 **Busy Faculty** ({len(busy_faculty)}):\n")
+            for faculty in busy_faculty:
+                append(f"• {faculty['name']} (teaching {faculty['course']} in {faculty['room']})\n")
         
-        return response
+        return ''.join(parts)
     
     def _handle_general_intelligent(self, query: str, context: dict) -> str:
         """Handle general queries with intelligent suggestions."""
-        response = "I can help you with various faculty and scheduling questions! Here's what I can do:\n\n"
+        parts = ["I can help you with various faculty and scheduling questions! Here's what I can do:\n\n"]
         
         suggestions = [
             "🔍 **Room Allocation**: 'Which room is allocated Prof. Sharma on Monday?'",
@@ -559,11 +619,11 @@ class IntelligentQueryProcessor:
         ]
         
         for suggestion in suggestions:
-            response += f"{suggestion}\n"
+            parts.append(f"{suggestion}\n")
         
-        response += "\n💡 **Tip**: Be specific about what you're looking for, and I'll provide detailed information!"
+        parts.append("\n💡 **Tip**: Be specific about what you're looking for, and I'll provide detailed information!")
         
-        return response
+        return ''.join(parts)
     
     def _suggest_clarification(self, query: str, context: dict, intent: str) -> str:
         """Suggest clarifications for incomplete queries."""
@@ -575,98 +635,277 @@ class IntelligentQueryProcessor:
         
         return "I need a bit more information to help you. Could you please be more specific about what you're looking for?"
 
-def _handle_general_query(query: str) -> str:
+def _handle_general_query(data_loader: FacultyDataLoader, pq: ParsedQuery) -> str:
     """Handle general timetable queries."""
     return "I can help you with:\n- Finding free faculty at specific times\n- Checking faculty schedules\n- Room availability\n- Course information\n\nPlease be more specific about what you're looking for."
 
 # Helper functions for workload reports
-def _handle_department_query(query: str) -> str:
+def _handle_department_query(data_loader: FacultyDataLoader, pq: ParsedQuery) -> str:
     """Handle department workload queries."""
-    words = query.lower().split()
+    words = pq.words
     department = None
     
     # Look for department names
-    departments = ['cse', 'eee', 'me', 'civil', 'ece', 'it']
-    for word in words:
-        if word in departments:
-            department = word.upper()
-            break
+    dept_word = next((word for word in words if word in _DEPARTMENT_RANK), None)
+    if dept_word:
+        department = dept_word.upper()
     
     if not department:
         return "Please specify a department (e.g., 'CSE department summary')"
     
-    result = _data_loader.get_department_summary(department)
+    result = data_loader.get_department_summary(department)
     
     if "error" in result:
         return result["error"]
     
-    response = f"Department Summary for {result['department']}:\n\n"
-    response += f"Total Faculty: {result['total_faculty']}\n"
-    response += f"Total Hours: {result['total_hours']}\n\n"
-    response += "Faculty Details:\n"
+    parts = [f"Department Summary for {result['department']}:\n\n"]
+    parts.append(f"Total Faculty: {result['total_faculty']}\n")
+    parts.append(f"Total Hours: {result['total_hours']}\n\n")
+    parts.append("Faculty Details:\n")
     for faculty in result['faculty_details']:
-        response += f"- {faculty['name']}: {faculty['courses']} ({faculty['hours_per_week']} hours/week)\n"
+        parts.append(f"- {faculty['name']}: {faculty['courses']} ({faculty['hours_per_week']} hours/week)\n")
     
-    return response
+    return ''.join(parts)
 
-def _handle_faculty_query(query: str) -> str:
+def _handle_faculty_query(data_loader: FacultyDataLoader, pq: ParsedQuery) -> str:
     """Handle individual faculty workload queries."""
-    words = query.lower().split()
-    faculty_name = None
-    
-    # Look for "Prof." or "Professor"
-    for i, word in enumerate(words):
-        if word in ['prof.', 'professor'] and i + 1 < len(words):
-            # Remove any punctuation from the name
-            name_part = words[i + 1].replace("'s", "").replace("'", "").replace(".", "")
-            faculty_name = "Prof." + name_part.capitalize()
-            break
+    faculty_name = _extract_faculty(pq.lower)
     
     if not faculty_name:
         return "Please specify a faculty member (e.g., 'Prof. Sharma workload')"
     
-    result = _data_loader.get_faculty_workload(faculty_name)
+    result = data_loader.get_faculty_workload(faculty_name)
     
     if "error" in result:
         return result["error"]
     
-    response = f"Workload Report for {result['name']}:\n\n"
-    response += f"Department: {result['department']}\n"
-    response += f"Total Hours: {result['total_hours']}\n\n"
-    response += "Courses:\n"
+    parts = [f"Workload Report for {result['name']}:\n\n"]
+    parts.append(f"Department: {result['department']}\n")
+    parts.append(f"Total Hours: {result['total_hours']}\n\n")
+    parts.append("Courses:\n")
     for course in result['course_details']:
-        response += f"- {course['course']}: {course['hours_per_week']} hours/week\n"
+        parts.append(f"- {course['course']}: {course['hours_per_week']} hours/week\n")
     
-    return response
+    return ''.join(parts)
 
-def _handle_all_faculty_query(query: str) -> str:
+def _handle_all_faculty_query(data_loader: FacultyDataLoader, pq: ParsedQuery) -> str:
     """Handle all faculty workload query."""
-    all_faculty = _data_loader.get_all_faculty()
+    workloads = data_loader.get_all_workloads()
     
-    response = f"All Faculty Workload Summary:\n\n"
-    response += f"Total Faculty: {len(all_faculty)}\n\n"
+    parts = [f"All Faculty Workload Summary:\n\n"]
+    parts.append(f"Total Faculty: {len(workloads)}\n\n")
     
-    # Get workload for each faculty
-    for faculty_name in all_faculty[:10]:  # Limit to first 10 for readability
-        result = _data_loader.get_faculty_workload(faculty_name)
-        if "error" not in result:
-            response += f"- {result['name']} ({result['department']}): {result['total_hours']} hours\n"
+    # Workloads come from a single aggregation; show the first 10 for readability
+    for row in workloads.head(10).itertuples(index=False):
+        parts.append(f"- {row.name} ({row.department}): {row.total_hours} hours\n")
     
-    if len(all_faculty) > 10:
-        response += f"... and {len(all_faculty) - 10} more faculty members.\n"
+    if len(workloads) > 10:
+        parts.append(f"... and {len(workloads) - 10} more faculty members.\n")
     
-    return response
+    return ''.join(parts)
 
-def _handle_general_workload_query(query: str) -> str:
+def _handle_general_workload_query(data_loader: FacultyDataLoader, pq: ParsedQuery) -> str:
     """Handle general workload queries."""
     return "I can help you with:\n- Individual faculty workload reports\n- Department workload summaries\n- All faculty workload overview\n\nPlease be more specific about what you want."
 
+# Intents answered without the LLM, each with the alternative sets of context
+# fields that make the answer unambiguous
+_DIRECT_INTENTS = {
+    "room_allocation": [('faculty', 'day')],
+    "faculty_schedule": [('faculty',)],
+    "workload_inquiry": [('faculty',), ('department',)],
+    "availability_check": [('day', 'time')],
+}
+
+# Yes/no questions ("Is Prof. Sharma free ...?") need a judgement, not a listing
+_YES_NO_RE = re.compile(r"^(?:is|are|am|was|were|do|does|did|can|could|will|would|should|has|have|had)\b")
+
+# Tool-level requests with no intent keyword of their own, e.g. "CSE department summary"
+_DEPARTMENT_SUMMARY_RE = re.compile(r"\bsummary\b.*\bdepartment\b|\bdepartment\b.*\bsummary\b")
+_ALL_FACULTY_RE = re.compile(r"\ball\b.*\bfaculty\b.*\b(?:workload|hours)\b")
+
+class QueryRouter:
+    """Answers queries that need no reasoning directly, so they skip the ReAct loop."""
+    
+    def __init__(self, processor: "IntelligentQueryProcessor", workload_tool: Tool):
+        self.processor = processor
+        self.workload_tool = workload_tool
+    
+    def match(self, question: str) -> Optional[str]:
+        """Return the answer for an unambiguous query, or None if the agent should handle it."""
+        query_lower = question.lower().strip()
+        # Comparisons and yes/no checks are left to the agent
+        if _YES_NO_RE.match(query_lower) or len({m.group('faculty') for m in _PROF_RE.finditer(query_lower)}) > 1:
+            return None
+        context = self.processor._extract_context(question.strip())
+        if context['department'] and not _has_explicit_department(question):
+            # Bare lowercase codes ("cse workload") are left to the agent
+            context['department'] = None
+        
+        # Only single-intent questions, for every shortcut below; "what policy applies
+        # when Prof. X teaches 14 hours?" needs the agent
+        intents = _matched_intents(query_lower)
+        if len(intents) > 1:
+            return None
+        intent = intents.pop() if intents else None
+        if intent in _DIRECT_INTENTS:
+            if any(all(context[field] for field in fields) for fields in _DIRECT_INTENTS[intent]):
+                return self.processor.process_query(question)
+        
+        if _ALL_FACULTY_RE.search(query_lower):
+            return self.workload_tool.func(question)
+        if context['department'] and not context['faculty'] and _DEPARTMENT_SUMMARY_RE.search(query_lower):
+            return self.processor._handle_workload_inquiry_intelligent(question, context)
+        return None
+
+# LLM handles and loaded policy stores shared by every agent in the process
+_OLLAMA_CACHE: Dict[str, "Ollama"] = {}
+_VECTOR_STORE_CACHE: Dict[str, Tuple[Optional[float], PolicyVectorStore]] = {}
+
+def _get_llm(model_name: str) -> "Ollama":
+    """Return the Ollama handle for a model, creating it on first use."""
+    if model_name not in _OLLAMA_CACHE:
+        # Imported lazily so callers that only use the query processor skip the LLM stack
+        from langchain_community.llms import Ollama
+        _OLLAMA_CACHE[model_name] = Ollama(model=model_name)
+    return _OLLAMA_CACHE[model_name]
+
+# ReAct prompt shared by every agent; the PromptTemplate is built on first use
+_REACT_PROMPT_TEMPLATE: Final[str] = """You are a helpful university faculty workload management assistant. You can help with:
+
+1. Faculty workload queries - Get information about individual faculty members' teaching loads
+2. Timetable queries - Find free faculty, check schedules, room availability
+3. Policy queries - Search university policies related to workload and scheduling
+4. Department summaries - Get workload overview for entire departments
+
+Use the available tools to answer user questions. Always provide clear, helpful responses.
+
+Available tools:
+{tools}
+
+Use the following format:
+
+Question: the input question you must answer
+Thought: you should always think about what to do
+Action: the action to take, should be one of [{tool_names}]
+Action Input: the input to the action
+Observation: the result of the action
+... (this Thought/Action/Action Input/Observation can repeat N times)
+Thought: I now know the final answer
+Final Answer: the final answer to the original input question
+
+Question: {input}
+Thought: {agent_scratchpad}"""
+
+@functools.lru_cache(maxsize=None)
+def _get_react_prompt() -> "PromptTemplate":
+    """Return the ReAct PromptTemplate, parsing the template only once per process."""
+    from langchain.prompts import PromptTemplate
+    return PromptTemplate(
+        template=_REACT_PROMPT_TEMPLATE,
+        input_variables=["input", "agent_scratchpad", "tools", "tool_names"]
+    )
+
+@functools.lru_cache(maxsize=None)
+def _get_question_embedder():
+    """Return MiniLM for question embeddings when available, else the placeholder embedder."""
+    if HAS_SENTENCE_TRANSFORMERS:
+        try:
+            from sentence_transformers import SentenceTransformer
+            return SentenceTransformer("all-MiniLM-L6-v2")
+        except Exception as e:
+            print(f"Could not load sentence-transformers model, using placeholder embeddings: {e}")
+    # Placeholder vectors only match questions that are identical after normalization
+    return RandomEmbedder(384)
+
+# Context fields that must match for a cached answer to be reused: "Is Prof. Sharma free
+# Monday at 10?" and "Is Prof. Verma free Monday at 10?" embed almost identically
+_CACHE_ENTITY_FIELDS = ('faculty', 'day', 'time', 'department')
+
+# Agent outputs that are failures rather than answers, never cached
+_UNCACHEABLE_PREFIXES = ("Agent stopped", "Error", "Could not parse")
+
+class AnswerCache:
+    """Semantic cache of agent answers.
+
+    Entries are keyed by question embedding plus the entities the question
+    names; a question whose cosine similarity with a cached question reaches
+    the threshold, and whose entities are the same, reuses its answer.
+    Entries expire after ttl seconds so answers do not go stale.
+    """
+    
+    def __init__(self, embedder, threshold: float = 0.92, ttl: float = 3600.0, capacity: int = 256):
+        self.embedder = embedder
+        self.threshold = threshold
+        self.ttl = ttl
+        self.capacity = capacity
+        self._keys = None  # (capacity, dim), allocated on first insert
+        self._stamps = np.full(capacity, -np.inf)  # insertion time per slot
+        self._answers = []  # answer per slot, parallel to _keys
+        self._entities = []  # entity tuple per slot, parallel to _keys
+        self._lock = threading.Lock()
+    
+    def embed(self, question: str) -> np.ndarray:
+        """Embed and L2-normalize a question."""
+        vec = np.asarray(self.embedder.encode(question), dtype='float32').ravel()
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+    
+    def get(self, embedding: np.ndarray, entities: Tuple = ()) -> Optional[str]:
+        """Return the answer of the closest unexpired cached question naming the same entities, if close enough."""
+        with self._lock:
+            size = len(self._answers)
+            if not size:
+                return None
+            scores = self._keys[:size] @ embedding
+            scores[time.monotonic() - self._stamps[:size] > self.ttl] = -np.inf
+            scores[np.fromiter((cached != entities for cached in self._entities), dtype=bool, count=size)] = -np.inf
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                return self._answers[best]
+        return None
+    
+    def put(self, embedding: np.ndarray, answer: str, entities: Tuple = ()):
+        """Cache an answer, replacing the oldest entry when full; agent failures are skipped."""
+        if not answer or answer.startswith(_UNCACHEABLE_PREFIXES):
+            return
+        with self._lock:
+            if self._keys is None:
+                self._keys = np.zeros((self.capacity, embedding.shape[0]), dtype='float32')
+            if len(self._answers) < self.capacity:
+                slot = len(self._answers)
+                self._answers.append(answer)
+                self._entities.append(entities)
+            else:
+                slot = int(np.argmin(self._stamps))
+                self._answers[slot] = answer
+                self._entities[slot] = entities
+            self._keys[slot] = embedding
+            self._stamps[slot] = time.monotonic()
+
+def _get_vector_store(policies_file: str = "policies.txt") -> PolicyVectorStore:
+    """Return a policy store loaded from policies_file, reused until the file changes."""
+    mtime = os.path.getmtime(policies_file) if os.path.exists(policies_file) else None
+    key = os.path.abspath(policies_file)
+    if key not in _VECTOR_STORE_CACHE:
+        vector_store = PolicyVectorStore()
+        vector_store.load_policies_from_file(policies_file)
+    else:
+        cached_mtime, vector_store = _VECTOR_STORE_CACHE[key]
+        if cached_mtime != mtime:
+            # The file was edited since it was embedded: rebuild rather than append duplicates
+            vector_store.clear_collection()
+            vector_store.load_policies_from_file(policies_file)
+    _VECTOR_STORE_CACHE[key] = (mtime, vector_store)
+    return vector_store
+
 class FacultyWorkloadAgent:
     """Main agent class for faculty workload management."""
     
-    def __init__(self, model_name: str = "llama2"):
-        """Initialize the agent with tools and LLM."""
+    def __init__(self, model_name: str = "llama2", verbose: bool = _VERBOSE):
+        """Initialize the agent with tools and LLM; verbose prints the ReAct trace."""
         self.model_name = model_name
+        self.verbose = verbose
         self.llm = None
         self.agent = None
         self.agent_executor = None
@@ -680,18 +919,24 @@ class FacultyWorkloadAgent:
             # Initialize data loader
             self.data_loader = FacultyDataLoader()
             
-            # Initialize vector store
-            self.vector_store = PolicyVectorStore()
-            self.vector_store.load_policies_from_file("policies.txt")
+            # Initialize vector store (shared while policies.txt is unchanged)
+            self.vector_store = _get_vector_store("policies.txt")
             
-            # Initialize LLM
-            self.llm = Ollama(model=self.model_name)
+            # Initialize LLM (one handle per model)
+            self.llm = _get_llm(self.model_name)
             
             # Create tools
             self.rag_tool = create_rag_policy_tool(self.vector_store)
             self.timetable_tool = create_timetable_query_tool(self.data_loader)
             self.workload_tool = create_workload_report_tool(self.data_loader)
             
+            # Deterministic processor and router used to answer unambiguous queries without the LLM
+            self.processor = IntelligentQueryProcessor(self.data_loader, self.vector_store)
+            self.router = QueryRouter(self.processor, self.workload_tool)
+            
+            # Answers from the ReAct agent, reused for near-duplicate questions
+            self.answer_cache = AnswerCache(_get_question_embedder())
+            
             # Create agent
             self._create_agent()
             
@@ -703,51 +948,40 @@ class FacultyWorkloadAgent:
     
     def _create_agent(self):
         """Create the LangChain agent."""
-        tools = [self.rag_tool, self.timetable_tool, self.workload_tool]
+        from langchain.agents import create_react_agent, AgentExecutor
         
-        # Create prompt template
-        prompt = PromptTemplate(
-            template="""You are a helpful university faculty workload management assistant. You can help with:
-
-1. Faculty workload queries - Get information about individual faculty members' teaching loads
-2. Timetable queries - Find free faculty, check schedules, room availability
-3. Policy queries - Search university policies related to workload and scheduling
-4. Department summaries - Get workload overview for entire departments
-
-Use the available tools to answer user questions. Always provide clear, helpful responses.
-
-Available tools:
-{tools}
-
-Use the following format:
-
-Question: the input question you must answer
-Thought: you should always think about what to do
-Action: the action to take, should be one of [{tool_names}]
-Action Input: the input to the action
-Observation: the result of the action
-... (this Thought/Action/Action Input/Observation can repeat N times)
-Thought: I now know the final answer
-Final Answer: the final answer to the original input question
-
-Question: {input}
-Thought: {agent_scratchpad}""",
-            input_variables=["input", "agent_scratchpad", "tools", "tool_names"]
-        )
+        tools = [self.rag_tool, self.timetable_tool, self.workload_tool]
         
         # Create agent
-        self.agent = create_react_agent(self.llm, tools, prompt)
+        self.agent = create_react_agent(self.llm, tools, _get_react_prompt())
         self.agent_executor = AgentExecutor(
             agent=self.agent,
             tools=tools,
-            verbose=True,
+            verbose=self.verbose,
             handle_parsing_errors=True
         )
     
     def query(self, question: str) -> str:
-        """Process a user query."""
+        """Process a user query.
+
+        Queries with a clear intent and the details it needs are answered
+        directly; everything else goes through the ReAct agent, whose answers
+        are cached for near-duplicate questions.
+        """
         try:
+            answer = self.router.match(question)
+            if answer is not None:
+                return answer
+            
+            embedding = self.answer_cache.embed(question)
+            context = self.processor._extract_context(question.strip())
+            entities = tuple(context[field] for field in _CACHE_ENTITY_FIELDS)
+            answer = self.answer_cache.get(embedding, entities)
+            if answer is not None:
+                return answer
+            
             response = self.agent_executor.invoke({"input": question})
+            self.answer_cache.put(embedding, response["output"], entities)
             return response["output"]
         except Exception as e:
             return f"Error processing query: {str(e)}"
@@ -765,6 +999,29 @@ if __name__ == "__main__":
         "Give me a summary of the CSE department workload"
     ]
     
+    # Queries the router must leave to the agent: pronouns that look like the ME/IT
+    # codes, comparisons, yes/no checks and questions mixing several intents
+    routing_checks = [
+        "Give me the policy on maximum workload hours",
+        "Can you tell me the rules on teaching hours?",
+        "Tell me which professors have the highest workload",
+        "Is it possible to reduce teaching hours for project guides?",
+        "which faculty have more than 10 hours? show me",
+        "Compare Prof. Sharma and Prof. Mehta workloads",
+        "Is Prof. Sharma free on Monday at 9 am?",
+        "What policy applies when Prof. Sharma teaches 14 hours?",
+        "What is the rule for Prof. Sharma's workload?",
+        "What is Prof. Sharma's workload compared with the policy maximum?",
+        "Which professors are free on Monday at 9 am and what policy governs free slots?",
+        "Show all faculty workload and the policy limits"
+    ]
+    
+    print("=== Routing Checks ===")
+    for query in routing_checks:
+        route = "agent" if agent.router.match(query) is None else "DIRECT"
+        print(f"{route:6} {query}")
+    assert all(agent.router.match(query) is None for query in routing_checks), "router answered a query meant for the agent"
+    
     print("=== Testing Faculty Workload Agent ===")
     
     for query in test_queries:
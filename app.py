@@ -7,7 +7,6 @@ import streamlit as st
 import pandas as pd
 from data_loader import FacultyDataLoader
 from vector_store import PolicyVectorStore
-from agent import create_rag_policy_tool, create_timetable_query_tool, create_workload_report_tool, IntelligentQueryProcessor
 
 # Page configuration
 st.set_page_config(
@@ -67,16 +66,38 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_data
+def _load_faculty_csv(path: str) -> pd.DataFrame:
+    """Read the faculty workload CSV once per file across sessions and reruns."""
+    return pd.read_csv(path)
+
+@st.cache_data
+def _load_timetable_csv(path: str) -> pd.DataFrame:
+    """Read the timetable CSV once per file across sessions and reruns."""
+    return pd.read_csv(path)
+
+@st.cache_resource
+def _load_vector_store(policies_file: str) -> PolicyVectorStore:
+    """Build the policy index once, independently of the other components."""
+    vector_store = PolicyVectorStore()
+    vector_store.load_policies_from_file(policies_file)
+    return vector_store
+
 @st.cache_resource
 def initialize_components():
     """Initialize all components with caching."""
+    # The agent module pulls in langchain; import it only when the components are first built
+    from agent import create_rag_policy_tool, create_timetable_query_tool, create_workload_report_tool, IntelligentQueryProcessor
+    
     try:
-        # Initialize data loader
-        data_loader = FacultyDataLoader()
+        # Initialize data loader from the cached CSV frames
+        data_loader = FacultyDataLoader(
+            faculty_df=_load_faculty_csv("faculty_workload.csv"),
+            timetable_df=_load_timetable_csv("timetable.csv")
+        )
         
         # Initialize vector store
-        vector_store = PolicyVectorStore()
-        vector_store.load_policies_from_file("policies.txt")
+        vector_store = _load_vector_store("policies.txt")
         
         # Create tools
         rag_tool = create_rag_policy_tool(vector_store)
@@ -89,7 +110,20 @@ def initialize_components():
         return data_loader, vector_store, rag_tool, timetable_tool, workload_tool, intelligent_processor
     except Exception as e:
         st.error(f"Error initializing components: {e}")
-        return None, None, None, None, None
+        return None, None, None, None, None, None
+
+@st.cache_data(show_spinner=False, ttl=3600)
+def _build_workload_summary(_data_loader: FacultyDataLoader, loader_id: int, limit: int = 10) -> pd.DataFrame:
+    """Workload table for the first faculty members; loader_id keys the cache instead of the loader."""
+    workloads = _data_loader.get_all_workloads().head(limit)[['name', 'department', 'total_hours']]
+    return workloads.rename(columns={'name': 'Faculty', 'department': 'Department', 'total_hours': 'Hours'})
+
+@st.cache_data(show_spinner=False, ttl=3600)
+def _build_department_summary(_data_loader: FacultyDataLoader, loader_id: int) -> pd.DataFrame:
+    """Faculty count and total hours per department; loader_id keys the cache instead of the loader."""
+    return _data_loader.get_all_department_summaries().rename(
+        columns={'department': 'Department', 'total_faculty': 'Faculty Count', 'total_hours': 'Total Hours'}
+    )
 
 def main():
     """Main application function."""
@@ -199,47 +233,16 @@ def main():
         st.header("📈 Data Overview")
         
         if data_loader:
-            # Faculty workload summary
+            # Faculty workload summary (first 10 faculty), built once per loader
             st.subheader("Faculty Workload Summary")
-            all_faculty = data_loader.get_all_faculty()
-            
-            # Create a simple workload summary
-            workload_data = []
-            for faculty_name in all_faculty[:10]:  # Show first 10
-                try:
-                    workload = data_loader.get_faculty_workload(faculty_name)
-                    if "error" not in workload:
-                        workload_data.append({
-                            "Faculty": faculty_name,
-                            "Department": workload.get("department", "N/A"),
-                            "Hours": workload.get("total_hours", 0)
-                        })
-                except:
-                    continue
-            
-            if workload_data:
-                df = pd.DataFrame(workload_data)
+            df = _build_workload_summary(data_loader, id(data_loader))
+            if not df.empty:
                 st.dataframe(df, use_container_width=True)
             
             # Department summary
             st.subheader("Department Summary")
-            departments = data_loader.get_all_departments()
-            dept_data = []
-            
-            for dept in departments:
-                try:
-                    dept_summary = data_loader.get_department_summary(dept)
-                    if "error" not in dept_summary:
-                        dept_data.append({
-                            "Department": dept,
-                            "Faculty Count": dept_summary.get("total_faculty", 0),
-                            "Total Hours": dept_summary.get("total_hours", 0)
-                        })
-                except:
-                    continue
-            
-            if dept_data:
-                dept_df = pd.DataFrame(dept_data)
+            dept_df = _build_department_summary(data_loader, id(data_loader))
+            if not dept_df.empty:
                 st.dataframe(dept_df, use_container_width=True)
         
         st.header("ℹ️ About")
@@ -1,26 +1,157 @@
 import pandas as pd
+import numpy as np
 from typing import List, Dict, Optional, Tuple
-import re
+import functools
+try:
+    from numba import njit  # type: ignore
+    HAS_NUMBA = True
+except Exception:
+    njit = None  # type: ignore
+    HAS_NUMBA = False
+
+
+_WEEKDAY_RANK = {day: rank for rank, day in enumerate(['monday', 'tuesday', 'wednesday', 'thursday', 'friday'])}
+
+
+if HAS_NUMBA:
+    # Compiled once and cached on disk so new processes skip the JIT cost
+    @njit(cache=True)
+    def _running_sessions(positions, start_minutes, end_minutes, minute):
+        """Row positions of one day's sessions (sorted by start) that are running at minute."""
+        started = np.searchsorted(start_minutes, minute, side='right')
+        running = np.empty(started, dtype=positions.dtype)
+        count = 0
+        for i in range(started):
+            if end_minutes[i] > minute:
+                running[count] = positions[i]
+                count += 1
+        return running[:count]
+else:
+    def _running_sessions(positions, start_minutes, end_minutes, minute):
+        """Row positions of one day's sessions (sorted by start) that are running at minute."""
+        started = np.searchsorted(start_minutes, minute, side='right')
+        return positions[:started][end_minutes[:started] > minute]
+
+@functools.lru_cache(maxsize=64)
+def _time_to_minutes(time_str: str) -> int:
+    """Parse "2 PM", "2:30 pm", "14:00" or "9" into minutes after midnight."""
+    text = time_str.strip().upper()
+    suffix = text[-2:]
+    if suffix == 'AM' or suffix == 'PM':
+        text = text[:-2].rstrip()
+    
+    colon = text.find(':')
+    if colon < 0:
+        hour, minute = int(text), 0
+    else:
+        hour, minute = int(text[:colon]), int(text[colon + 1:])
+    
+    # 12-hour clock: 12 PM is noon and 12 AM is midnight
+    if suffix == 'PM' and hour != 12:
+        hour += 12
+    elif suffix == 'AM' and hour == 12:
+        hour = 0
+    return hour * 60 + minute
 
 class FacultyDataLoader:
     """Data loader for faculty workload and timetable management."""
     
-    def __init__(self, faculty_file: str = "faculty_workload.csv", timetable_file: str = "timetable.csv"):
-        """Initialize the data loader with CSV files."""
-        self.faculty_df = pd.read_csv(faculty_file)
-        self.timetable_df = pd.read_csv(timetable_file)
+    def __init__(self, faculty_file: str = "faculty_workload.csv", timetable_file: str = "timetable.csv",
+                 faculty_df: Optional[pd.DataFrame] = None, timetable_df: Optional[pd.DataFrame] = None):
+        """Initialize the data loader with CSV files, or with frames already read from them."""
+        self.faculty_df = pd.read_csv(faculty_file) if faculty_df is None else faculty_df
+        self.timetable_df = pd.read_csv(timetable_file) if timetable_df is None else timetable_df
         
         # Clean data
         self.faculty_df = self.faculty_df.dropna()
         self.timetable_df = self.timetable_df.dropna()
         
-        # Convert time format for easier parsing
-        self.timetable_df['StartTime'] = self.timetable_df['Time'].str.split('-').str[0]
-        self.timetable_df['EndTime'] = self.timetable_df['Time'].str.split('-').str[1]
+        self._build_derived()
+        if HAS_NUMBA and self._day_sessions:
+            # Compile (or load from the on-disk cache) now rather than on the first availability query
+            _running_sessions(*self._day_sessions[0], 0)
+        
+        self._build_indices()
+        
+        # Memoize schedule lookups per instance; call invalidate() after changing timetable_df
+        self.get_faculty_schedule = functools.lru_cache(maxsize=1024)(self.get_faculty_schedule)
+    
+    def invalidate(self):
+        """Rebuild derived columns, indices and cached lookups after the underlying data has been modified."""
+        self._build_derived()
+        self._build_indices()
+        self.get_faculty_schedule.cache_clear()
+    
+    def _build_derived(self):
+        """Derive the categorical, time-range and per-day session data the lookups rely on."""
+        # Low-cardinality text columns as categoricals: small integer codes instead of Python strings
+        for column in ('Day', 'Faculty', 'Room'):
+            self.timetable_df[column] = self.timetable_df[column].astype('category')
+        self.faculty_df['Department'] = self.faculty_df['Department'].astype('category')
+        
+        # Convert time format for easier parsing; one regex pass yields both ends of the range
+        times = self.timetable_df['Time'].str.extract(r'^\s*(\S+)\s*-\s*(\S+)\s*$')
+        self.timetable_df['StartTime'] = times[0]
+        self.timetable_df['EndTime'] = times[1]
+        
+        # Minute-of-day bounds so availability checks compare integers, not strings
+        self.timetable_df['StartMinute'] = self._column_to_minutes(self.timetable_df['StartTime'])
+        self.timetable_df['EndMinute'] = self._column_to_minutes(self.timetable_df['EndTime'])
+        
+        # Days become small integer codes
+        day_codes, day_names = pd.factorize(self.timetable_df['Day'].str.lower())
+        self._day_codes = np.ascontiguousarray(day_codes, dtype=np.int8)
+        self._day_index = {name: code for code, name in enumerate(day_names)}
+        self.timetable_df['DayCode'] = self._day_codes
+        
+        # Per-day session arrays sorted by start minute, so availability checks
+        # binary-search the sessions already started instead of scanning the week
+        start_minutes = self.timetable_df['StartMinute'].to_numpy()
+        end_minutes = self.timetable_df['EndMinute'].to_numpy()
+        self._day_sessions = {}
+        for code in range(len(day_names)):
+            positions = np.flatnonzero(self._day_codes == code)
+            positions = positions[np.argsort(start_minutes[positions], kind='stable')]
+            self._day_sessions[code] = (positions, start_minutes[positions], end_minutes[positions])
+    
+    def _build_indices(self):
+        """Index row positions by lowercase key for the columns that queries filter on."""
+        self._faculty_by_name = self._positions_by_key(self.faculty_df['Name'])
+        self._faculty_by_dept = self._positions_by_key(self.faculty_df['Department'])
+        self._faculty_by_course = self._positions_by_key(self.faculty_df['Course'])
+        self._tt_by_faculty = self._positions_by_key(self.timetable_df['Faculty'])
+        self._tt_by_room = self._positions_by_key(self.timetable_df['Room'])
+        self._all_faculty = self.faculty_df['Name'].unique().tolist()
+        self._all_departments = self.faculty_df['Department'].unique().tolist()
+    
+    @staticmethod
+    def _positions_by_key(column: pd.Series) -> Dict[str, np.ndarray]:
+        """Map each lowercase value of a column to the row positions holding it."""
+        keys = column.str.lower()
+        return keys.groupby(keys.to_numpy(), sort=False).indices
+    
+    def _matching_day_codes(self, day: str) -> List[int]:
+        """Codes of the timetable days whose name contains day (case-insensitive)."""
+        day_key = day.strip().lower()
+        day_code = self._day_index.get(day_key)
+        if day_code is not None:
+            return [day_code]
+        return [code for name, code in self._day_index.items() if day_key in name]
+    
+    @staticmethod
+    def _lookup(df: pd.DataFrame, index: Dict[str, np.ndarray], key: str) -> pd.DataFrame:
+        """Rows whose indexed value contains key (case-insensitive), in their original order."""
+        key = key.lower()
+        positions = index.get(key)
+        if positions is None:
+            # Not an exact value, so fall back to substring matching over the distinct keys
+            matches = [rows for value, rows in index.items() if key in value]
+            positions = np.sort(np.concatenate(matches)) if matches else np.empty(0, dtype=np.intp)
+        return df.iloc[positions]
     
     def get_faculty_workload(self, faculty_name: str) -> Dict:
         """Get workload information for a specific faculty member."""
-        faculty_data = self.faculty_df[self.faculty_df['Name'].str.contains(faculty_name, case=False, na=False)]
+        faculty_data = self._lookup(self.faculty_df, self._faculty_by_name, faculty_name)
         
         if faculty_data.empty:
             return {"error": f"Faculty member '{faculty_name}' not found"}
@@ -30,77 +161,73 @@ class FacultyDataLoader:
             "department": faculty_data.iloc[0]['Department'],
             "courses": faculty_data['Course'].tolist(),
             "total_hours": faculty_data['HoursPerWeek'].sum(),
-            "course_details": []
+            "course_details": self._records(faculty_data, {'Course': 'course', 'HoursPerWeek': 'hours_per_week'})
         }
         
-        for _, row in faculty_data.iterrows():
-            result["course_details"].append({
-                "course": row['Course'],
-                "hours_per_week": row['HoursPerWeek']
-            })
-        
         return result
     
+    def get_all_workloads(self) -> pd.DataFrame:
+        """Get department, total weekly hours and courses for every faculty member in one aggregation."""
+        return self.faculty_df.groupby('Name', sort=False).agg(
+            department=('Department', 'first'),
+            total_hours=('HoursPerWeek', 'sum'),
+            courses=('Course', list)
+        ).reset_index().rename(columns={'Name': 'name'})
+    
+    def get_all_department_summaries(self) -> pd.DataFrame:
+        """Get faculty count and total weekly hours for every department in one aggregation."""
+        return self.faculty_df.groupby('Department', sort=False, observed=True).agg(
+            total_faculty=('Name', 'size'),
+            total_hours=('HoursPerWeek', 'sum')
+        ).reset_index().rename(columns={'Department': 'department'})
+    
     def get_faculty_schedule(self, faculty_name: str, day: Optional[str] = None) -> Dict:
         """Get schedule information for a specific faculty member."""
-        faculty_schedule = self.timetable_df[
-            self.timetable_df['Faculty'].str.contains(faculty_name, case=False, na=False)
-        ]
+        faculty_schedule = self._lookup(self.timetable_df, self._tt_by_faculty, faculty_name)
         
         if day:
-            faculty_schedule = faculty_schedule[
-                faculty_schedule['Day'].str.contains(day, case=False, na=False)
-            ]
+            faculty_schedule = faculty_schedule[faculty_schedule['DayCode'].isin(self._matching_day_codes(day))]
         
         if faculty_schedule.empty:
             return {"error": f"No schedule found for '{faculty_name}'" + (f" on {day}" if day else "")}
         
-        result = {
+        return {
             "name": faculty_name,
             "day": day,
-            "sessions": []
+            "sessions": self._session_records(faculty_schedule, ['Day', 'Time', 'Course', 'Room'])
         }
+    
+    def get_faculty_schedule_week(self, faculty_name: str) -> Dict[str, List[Dict]]:
+        """Get a faculty member's sessions for the whole week, grouped by day."""
+        faculty_schedule = self._lookup(self.timetable_df, self._tt_by_faculty, faculty_name)
         
-        for _, row in faculty_schedule.iterrows():
-            result["sessions"].append({
-                "day": row['Day'],
-                "time": row['Time'],
-                "course": row['Course'],
-                "room": row['Room']
-            })
+        # Monday to Friday regardless of row order; any other day names follow in order of appearance
+        days = sorted(faculty_schedule.groupby('Day', sort=False, observed=True),
+                      key=lambda group: _WEEKDAY_RANK.get(str(group[0]).lower(), len(_WEEKDAY_RANK)))
+        week = {}
+        for day, day_schedule in days:
+            week[day] = self._session_records(day_schedule, ['Day', 'Time', 'Course', 'Room'])
         
-        return result
+        return week
     
     def get_free_faculty(self, day: str, time: str) -> Dict:
         """Find faculty members who are free at a specific day and time."""
-        # Convert time to 24-hour format for comparison
-        time_24 = self._convert_to_24hour(time)
+        # Convert time to minutes after midnight for numeric comparison
+        minute = self._to_minutes(time)
         
-        # Find all faculty teaching at the specified day and time
-        busy_faculty = self.timetable_df[
-            (self.timetable_df['Day'].str.contains(day, case=False, na=False)) &
-            (self.timetable_df['StartTime'] <= time_24) &
-            (self.timetable_df['EndTime'] > time_24)
-        ]['Faculty'].tolist()
+        # Find the sessions running at that time on each matching day (partial names such as "day" match several)
+        running = [_running_sessions(*self._day_sessions[code], minute) for code in self._matching_day_codes(day)]
+        busy_positions = np.sort(np.concatenate(running)) if running else np.empty(0, dtype=np.intp)
         
-        # Get all faculty members
-        all_faculty = self.faculty_df['Name'].unique().tolist()
+        # One narrow slice, in timetable order, feeds both the busy names and the busy details
+        busy_sessions = self.timetable_df.iloc[busy_positions][['Faculty', 'Course', 'Room']]
         
-        # Find free faculty
-        free_faculty = [f for f in all_faculty if f not in busy_faculty]
+        # Free faculty are all faculty members not teaching in any of those sessions
+        busy_faculty = set(busy_sessions['Faculty'])
+        free_faculty = [name for name in self._all_faculty if name not in busy_faculty]
         
         # Get details of busy faculty
-        busy_details = []
-        for _, row in self.timetable_df[
-            (self.timetable_df['Day'].str.contains(day, case=False, na=False)) &
-            (self.timetable_df['StartTime'] <= time_24) &
-            (self.timetable_df['EndTime'] > time_24)
-        ].iterrows():
-            busy_details.append({
-                "name": row['Faculty'],
-                "course": row['Course'],
-                "room": row['Room']
-            })
+        busy_details = self._records(busy_sessions, {'Faculty': 'name', 'Course': 'course', 'Room': 'room'})
         
         return {
             "day": day,
@@ -111,9 +238,7 @@ class FacultyDataLoader:
     
     def get_department_summary(self, department: str) -> Dict:
         """Get workload summary for a specific department."""
-        dept_faculty = self.faculty_df[
-            self.faculty_df['Department'].str.contains(department, case=False, na=False)
-        ]
+        dept_faculty = self._lookup(self.faculty_df, self._faculty_by_dept, department)
         
         if dept_faculty.empty:
             return {"error": f"Department '{department}' not found"}
@@ -122,99 +247,67 @@ class FacultyDataLoader:
             "department": department,
             "total_faculty": len(dept_faculty),
             "total_hours": dept_faculty['HoursPerWeek'].sum(),
-            "faculty_details": []
+            "faculty_details": self._records(
+                dept_faculty, {'Name': 'name', 'Course': 'courses', 'HoursPerWeek': 'hours_per_week'}
+            )
         }
         
-        for _, row in dept_faculty.iterrows():
-            result["faculty_details"].append({
-                "name": row['Name'],
-                "courses": row['Course'],
-                "hours_per_week": row['HoursPerWeek']
-            })
-        
         return result
     
     def search_faculty_by_course(self, course_name: str) -> List[Dict]:
         """Find faculty members teaching a specific course."""
-        course_faculty = self.faculty_df[
-            self.faculty_df['Course'].str.contains(course_name, case=False, na=False)
-        ]
-        
-        result = []
-        for _, row in course_faculty.iterrows():
-            result.append({
-                "name": row['Name'],
-                "department": row['Department'],
-                "course": row['Course'],
-                "hours_per_week": row['HoursPerWeek']
-            })
+        course_faculty = self._lookup(self.faculty_df, self._faculty_by_course, course_name)
         
-        return result
+        return self._records(course_faculty, {
+            'Name': 'name',
+            'Department': 'department',
+            'Course': 'course',
+            'HoursPerWeek': 'hours_per_week'
+        })
     
     def get_room_schedule(self, room: str, day: Optional[str] = None) -> Dict:
         """Get schedule for a specific room."""
-        room_schedule = self.timetable_df[
-            self.timetable_df['Room'].str.contains(room, case=False, na=False)
-        ]
+        room_schedule = self._lookup(self.timetable_df, self._tt_by_room, room)
         
         if day:
-            room_schedule = room_schedule[
-                room_schedule['Day'].str.contains(day, case=False, na=False)
-            ]
+            room_schedule = room_schedule[room_schedule['DayCode'].isin(self._matching_day_codes(day))]
         
         if room_schedule.empty:
             return {"error": f"No schedule found for room '{room}'" + (f" on {day}" if day else "")}
         
-        result = {
+        return {
             "room": room,
             "day": day,
-            "sessions": []
+            "sessions": self._session_records(room_schedule, ['Day', 'Time', 'Course', 'Faculty'])
         }
-        
-        for _, row in room_schedule.iterrows():
-            result["sessions"].append({
-                "day": row['Day'],
-                "time": row['Time'],
-                "course": row['Course'],
-                "faculty": row['Faculty']
-            })
-        
-        return result
     
-    def _convert_to_24hour(self, time_str: str) -> str:
-        """Convert time string to 24-hour format for comparison."""
-        # Handle formats like "2 PM", "2:00 PM", "14:00", etc.
-        time_str = time_str.strip().upper()
-        
-        if 'AM' in time_str or 'PM' in time_str:
-            # 12-hour format
-            time_part = re.sub(r'[AP]M', '', time_str).strip()
-            if ':' not in time_part:
-                time_part += ':00'
-            
-            hour, minute = time_part.split(':')
-            hour = int(hour)
-            minute = int(minute)
-            
-            if 'PM' in time_str and hour != 12:
-                hour += 12
-            elif 'AM' in time_str and hour == 12:
-                hour = 0
-            
-            return f"{hour:02d}:{minute:02d}"
-        else:
-            # Assume 24-hour format
-            if ':' not in time_str:
-                time_str += ':00'
-            return time_str
+    @staticmethod
+    def _records(rows: pd.DataFrame, columns: Dict[str, str]) -> List[Dict]:
+        """Build dicts column-wise from a frame slice, renaming each column to its key."""
+        return rows[list(columns)].rename(columns=columns).to_dict('records')
+    
+    @staticmethod
+    def _session_records(sessions: pd.DataFrame, columns: List[str]) -> List[Dict]:
+        """Build session dicts column-wise from a timetable slice, with lowercase keys."""
+        return sessions[columns].rename(columns=str.lower).to_dict('records')
+    
+    def _to_minutes(self, time_str: str) -> int:
+        """Convert a time string (e.g. "2 PM", "14:00") to minutes after midnight."""
+        return _time_to_minutes(time_str)
+    
+    @staticmethod
+    def _column_to_minutes(times: pd.Series) -> pd.Series:
+        """Convert a column of "HH:MM" strings to int16 minutes after midnight."""
+        hours_minutes = times.str.strip().str.split(':', expand=True).astype(int)
+        return (hours_minutes[0] * 60 + hours_minutes[1]).astype('int16')
     
     def get_all_departments(self) -> List[str]:
         """Get list of all departments."""
-        return self.faculty_df['Department'].unique().tolist()
+        return list(self._all_departments)
     
     def get_all_faculty(self) -> List[str]:
         """Get list of all faculty members."""
-        return self.faculty_df['Name'].unique().tolist()
+        return list(self._all_faculty)
 
 # Example usage and testing
 if __name__ == "__main__":
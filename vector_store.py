@@ -4,20 +4,180 @@ try:
 except Exception:
     faiss = None  # type: ignore
     HAS_FAISS = False
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.ipc  # type: ignore
+    HAS_PYARROW = True
+except Exception:
+    pa = None  # type: ignore
+    HAS_PYARROW = False
+try:
+    from numba import njit, prange  # type: ignore
+    HAS_NUMBA = True
+except Exception:
+    njit = None  # type: ignore
+    HAS_NUMBA = False
+import math
 import numpy as np
 import pickle
 import os
-from typing import List, Dict
+import threading
+import zlib
+from collections import OrderedDict, defaultdict
+from typing import Iterable, List, Dict, Optional, Tuple
 import re
 
+# Below this many vectors an exact flat scan is cheap; above it FAISS switches to an IVF index
+IVF_MIN_VECTORS = 4096
+
+# OpenMP threads FAISS spreads batched searches over; FWA_FAISS_THREADS=n overrides the CPU count
+FAISS_THREADS = int(os.getenv("FWA_FAISS_THREADS", "0")) or os.cpu_count() or 1
+
+# Rows upcast from float16 per matmul when the NumPy fallback stores half-precision embeddings
+_UPCAST_BLOCK = 16384
+
+
+if HAS_NUMBA:
+    # Compiled once and cached on disk so new processes skip the JIT cost
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _search_topk(embeddings, query, k):
+        """Scores and row indices of the k rows with the largest dot product with query, best first."""
+        n = embeddings.shape[0]
+        sims = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            acc = np.float32(0.0)
+            for j in range(query.shape[0]):
+                acc += embeddings[i, j] * query[j]
+            sims[i] = acc
+
+        # Insertion into a k-slot buffer kept sorted by score; k is small
+        k = max(0, min(k, n))
+        top_scores = np.empty(k, dtype=np.float32)
+        top_indices = np.empty(k, dtype=np.int64)
+        filled = 0
+        for i in range(n):
+            score = sims[i]
+            if filled < k:
+                pos = filled
+                filled += 1
+            elif k > 0 and score > top_scores[k - 1]:
+                pos = k - 1
+            else:
+                continue
+            while pos > 0 and top_scores[pos - 1] < score:
+                top_scores[pos] = top_scores[pos - 1]
+                top_indices[pos] = top_indices[pos - 1]
+                pos -= 1
+            top_scores[pos] = score
+            top_indices[pos] = i
+        return top_scores, top_indices
+
+
+class RandomEmbedder:
+    """Placeholder embedder returning pseudo-random vectors (demo only).
+
+    Vectors are seeded from the normalized text, so the same query always maps to
+    the same embedding. Mirrors the ``encode`` interface of sentence-transformers.
+    """
+
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+
+    def encode(self, texts):
+        """Embed a string (1-D result) or a list of strings (2-D result)."""
+        if isinstance(texts, str):
+            return self._encode_one(texts)
+        return np.array([self._encode_one(text) for text in texts], dtype='float32').reshape(-1, self.dimension)
+
+    def _encode_one(self, text: str) -> np.ndarray:
+        seed = zlib.crc32(" ".join(text.lower().split()).encode('utf-8'))
+        # PCG64 seeds and draws float32 directly; legacy RandomState seeding costs ~10x more per query
+        return np.random.default_rng(seed).random(self.dimension, dtype=np.float32)
+
+
+class PolicyMetadata:
+    """Policy metadata kept as parallel columns (struct of arrays) instead of one dict per policy.
+
+    Reads like the list of dicts it replaces: len(), indexing, slicing and
+    iteration build each row dict on demand. Category and source strings are
+    interned in a shared vocabulary and texts live in one UTF-8 buffer.
+    """
+
+    def __init__(self, rows: Iterable[Dict] = ()):
+        self.policy_numbers = np.zeros(0, dtype=np.int32)
+        self.category_ids = np.zeros(0, dtype=np.int16)
+        self.source_ids = np.zeros(0, dtype=np.int16)
+        self.vocab = []  # strings referenced by category_ids and source_ids
+        self._vocab_ids = {}
+        self._text_blob = bytearray()
+        self._text_offsets = np.zeros(1, dtype=np.int64)  # text i is _text_blob[offsets[i]:offsets[i + 1]]
+        self.extend(rows)
+
+    def extend(self, rows: Iterable[Dict]):
+        """Append metadata dicts with policy_number, category, source and text keys."""
+        rows = list(rows)
+        if not rows:
+            return
+        count = len(rows)
+        texts = [row['text'].encode('utf-8') for row in rows]
+        self.policy_numbers = np.concatenate([
+            self.policy_numbers, np.fromiter((row['policy_number'] for row in rows), dtype=np.int32, count=count)])
+        self.category_ids = np.concatenate([
+            self.category_ids, np.fromiter((self._intern(row['category']) for row in rows), dtype=np.int16, count=count)])
+        self.source_ids = np.concatenate([
+            self.source_ids, np.fromiter((self._intern(row['source']) for row in rows), dtype=np.int16, count=count)])
+        lengths = np.fromiter(map(len, texts), dtype=np.int64, count=count)
+        self._text_offsets = np.concatenate([self._text_offsets, self._text_offsets[-1] + np.cumsum(lengths)])
+        self._text_blob += b"".join(texts)
+
+    def _intern(self, value: str) -> int:
+        vocab_id = self._vocab_ids.get(value)
+        if vocab_id is None:
+            vocab_id = self._vocab_ids[value] = len(self.vocab)
+            self.vocab.append(value)
+        return vocab_id
+
+    def __len__(self) -> int:
+        return len(self.policy_numbers)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._row(j) for j in range(*i.indices(len(self)))]
+        return self._row(range(len(self))[i])  # normalizes negative positions, raises IndexError
+
+    def __iter__(self):
+        return (self._row(i) for i in range(len(self)))
+
+    def _row(self, i: int) -> Dict:
+        start, end = self._text_offsets[i], self._text_offsets[i + 1]
+        return {
+            "policy_number": int(self.policy_numbers[i]),
+            "category": self.vocab[self.category_ids[i]],
+            "source": self.vocab[self.source_ids[i]],
+            "text": self._text_blob[start:end].decode('utf-8'),
+        }
+
+
 class PolicyVectorStore:
     """Vector store for university policies using FAISS, with NumPy fallback."""
     
-    def __init__(self, persist_directory: str = "./faiss_db", collection_name: str = "university_policies"):
-        """Initialize vector index and storage (FAISS if available, else NumPy)."""
+    def __init__(self, persist_directory: str = "./faiss_db", collection_name: str = "university_policies",
+                 nprobe: int = 8, use_pq: bool = False, half_precision: bool = False):
+        """Initialize vector index and storage (FAISS if available, else NumPy).
+
+        Large FAISS collections use an IVF index; nprobe is the number of lists
+        scanned per query and use_pq compresses vectors with IVFPQ to save memory.
+        half_precision stores vectors as float16, halving index memory; scores are
+        still computed in float32.
+        """
         self.persist_directory = persist_directory
         self.collection_name = collection_name
         self.dimension = 384  # Default embedding dimension
+        self.nprobe = nprobe
+        self.use_pq = use_pq
+        self.half_precision = half_precision
+        self._embedder = RandomEmbedder(self.dimension)
+        self._rng = np.random.default_rng()  # Placeholder document embeddings
         
         # Create directory if it doesn't exist
         os.makedirs(persist_directory, exist_ok=True)
@@ -25,27 +185,56 @@ class PolicyVectorStore:
         # Paths
         self.index_path = os.path.join(persist_directory, f"{collection_name}.index")
         self.metadata_path = os.path.join(persist_directory, f"{collection_name}_metadata.pkl")
-        self.embeddings_path = os.path.join(persist_directory, f"{collection_name}_embeddings.npy")
+        self.metadata_arrow_path = os.path.join(persist_directory, f"{collection_name}_metadata.arrows")
+        self.embeddings_path = os.path.join(persist_directory, f"{collection_name}_embeddings.npy")  # Legacy snapshot
 
         # Load existing data or initialize
-        self.metadata = []
+        self.metadata = PolicyMetadata()
         self.embeddings = None  # Only used in NumPy fallback
+        self._embedding_buf = None  # Backing array of self.embeddings with spare rows for appends
+        self._index_mapped = False  # FAISS index read-only from its memory-mapped file
+        # Records already in the append-only logs; _save_index writes only the rest
+        self._saved_metadata = 0
+        self._saved_rows = 0
+
+        # Approximate cache shared by every tool searching this store
+        self.query_cache = PolicyQueryCache(self)
 
         if HAS_FAISS:
-            if os.path.exists(self.index_path) and os.path.exists(self.metadata_path):
-                self.index = faiss.read_index(self.index_path)
-                with open(self.metadata_path, 'rb') as f:
-                    self.metadata = pickle.load(f)
+            faiss.omp_set_num_threads(FAISS_THREADS)
+            if os.path.exists(self.index_path) and self._has_saved_metadata():
+                # Memory-map the index so startup does not copy it into process memory
+                self.index = faiss.read_index(self.index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+                self._index_mapped = True
+                self._set_nprobe()
+                self.metadata = PolicyMetadata(self._load_metadata())
             else:
-                self.index = faiss.IndexFlatIP(self.dimension)  # Inner product for cosine similarity
+                self.index = self._new_flat_index()
         else:
             # NumPy fallback: load embeddings and metadata if present
-            if os.path.exists(self.embeddings_path) and os.path.exists(self.metadata_path):
-                self.embeddings = np.load(self.embeddings_path)
-                with open(self.metadata_path, 'rb') as f:
-                    self.metadata = pickle.load(f)
+            embeddings = self._load_embeddings() if self._has_saved_metadata() else None
+            if embeddings is not None:
+                self.metadata = PolicyMetadata(self._load_metadata())
+                if len(embeddings) != len(self.metadata):
+                    # A save was interrupted between the two logs: keep the common prefix, rewrite both on the next save
+                    count = min(len(embeddings), len(self.metadata))
+                    embeddings, self.metadata = embeddings[:count], PolicyMetadata(self.metadata[:count])
+                    self._saved_metadata = self._saved_rows = 0
+                self.embeddings = embeddings
             else:
-                self.embeddings = np.zeros((0, self.dimension), dtype='float32')
+                self.embeddings = np.zeros((0, self.dimension), dtype=self._storage_dtype)
+            if HAS_NUMBA:
+                # Compile (or load from the on-disk cache) now rather than on the first search, for
+                # both in-memory embeddings and read-only memory-mapped ones (a separate signature)
+                warmup = np.zeros((0, self.dimension), dtype='float32')
+                query = np.zeros(self.dimension, dtype='float32')
+                _search_topk(warmup, query, 1)
+                warmup.flags.writeable = False
+                _search_topk(warmup, query, 1)
+
+        # Category -> metadata positions, extended as policies are added
+        self._by_category = defaultdict(list)
+        self._index_categories(0)
     
     def load_policies_from_file(self, policies_file: str = "policies.txt", force: bool = False):
         """Load policies from text file and store in vector database.
@@ -56,41 +245,22 @@ class PolicyVectorStore:
             # Avoid duplicating data on repeated runs unless forced
             if self.metadata and not force:
                 return True
+            # Split policies into chunks (each policy rule is a chunk), streaming the file line by line
             with open(policies_file, 'r', encoding='utf-8') as file:
-                content = file.read()
-            
-            # Split policies into chunks (each policy rule is a chunk)
-            policy_chunks = self._split_policies(content)
-            
-            # Prepare documents for embedding
-            documents = []
-            metadatas = []
-            
-            for i, chunk in enumerate(policy_chunks):
-                documents.append(chunk['text'])
-                metadatas.append({
-                    "policy_number": chunk['policy_number'],
-                    "category": chunk['category'],
-                    "source": "policies.txt",
-                    "text": chunk['text']
-                })
-            
-            # Simple random embeddings (demo only)
-            embeddings = np.random.rand(len(documents), self.dimension).astype('float32')
+                documents, metadatas = self._collect_chunks(file)
 
-            # Normalize embeddings for cosine similarity
-            self._normalize_inplace(embeddings)
+            # One embedding call for every document
+            embeddings = self._embed_batch(documents)
 
             # Add to index
             if HAS_FAISS:
-                self.index.add(embeddings)
+                self._add_to_index(embeddings)
             else:
-                if self.embeddings is None or self.embeddings.size == 0:
-                    self.embeddings = embeddings
-                else:
-                    self.embeddings = np.vstack([self.embeddings, embeddings])
+                self._append_embeddings(embeddings)
 
+            self._index_categories(len(self.metadata), metadatas)
             self.metadata.extend(metadatas)
+            self.query_cache.clear()
 
             # Persist
             self._save_index()
@@ -102,112 +272,295 @@ class PolicyVectorStore:
             print(f"Error loading policies: {e}")
             return False
     
-    def _split_policies(self, content: str) -> List[Dict]:
-        """Split policy text into meaningful chunks."""
-        lines = content.strip().split('\n')
-        chunks = []
+    def _collect_chunks(self, lines: Iterable[str]) -> Tuple[List[str], List[Dict]]:
+        """Split policy lines into parallel lists of chunk texts and their metadata."""
+        documents = []
+        metadatas = []
+        for chunk in self._split_policies(lines):
+            documents.append(chunk['text'])
+            metadatas.append({
+                "policy_number": chunk['policy_number'],
+                "category": chunk['category'],
+                "source": "policies.txt",
+                "text": chunk['text']
+            })
+        return documents, metadatas
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Embed all texts in a single call as a normalized (len(texts), dimension) float32 matrix.
+
+        A real encoder belongs here as one batched call, e.g. sentence-transformers'
+        encode(texts, batch_size=64, normalize_embeddings=True).
+        """
+        # Simple random embeddings (demo only), drawn as float32 without a float64 intermediate
+        embeddings = self._rng.random((len(texts), self.dimension), dtype=np.float32)
+
+        # Normalize embeddings for cosine similarity
+        self._normalize_inplace(embeddings)
+        return embeddings
+
+    def _add_to_index(self, embeddings: np.ndarray):
+        """Add vectors to the FAISS index, switching to a trained IVF index once the collection is large."""
+        if self._index_mapped:
+            # Mapped inverted lists are read-only; adds go to a writable in-memory copy
+            self.index = faiss.read_index(self.index_path)
+            self._index_mapped = False
+            self._set_nprobe()
+        total = self.index.ntotal + len(embeddings)
+        if isinstance(self.index, faiss.IndexIVF) or total < IVF_MIN_VECTORS:
+            self.index.add(embeddings)
+            return
         
-        current_chunk = ""
+        # Rebuild from every vector kept by the flat (or fp16 scalar-quantized) index
+        if self.index.ntotal:
+            embeddings = np.vstack([self.index.reconstruct_n(0, self.index.ntotal), embeddings])
+        nlist = int(np.sqrt(total))
+        quantizer = faiss.IndexFlatIP(self.dimension)
+        if self.use_pq:
+            # 32 sub-quantizers of 8 bits: 32 bytes per vector instead of 1536
+            index = faiss.IndexIVFPQ(quantizer, self.dimension, nlist, 32, 8, faiss.METRIC_INNER_PRODUCT)
+        elif self.half_precision:
+            index = faiss.IndexIVFScalarQuantizer(quantizer, self.dimension, nlist, faiss.ScalarQuantizer.QT_fp16,
+                                                  faiss.METRIC_INNER_PRODUCT)
+        else:
+            index = faiss.IndexIVFFlat(quantizer, self.dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+        index.train(embeddings)
+        index.add(embeddings)
+        self.index = index
+        self._set_nprobe()
+
+    def _append_embeddings(self, embeddings: np.ndarray):
+        """Append rows to the NumPy fallback embeddings, growing the backing array geometrically.
+
+        self.embeddings stays a view of the filled rows, so repeated loads copy the
+        existing rows only when the capacity doubles instead of on every call.
+        """
+        size = 0 if self.embeddings is None else len(self.embeddings)
+        needed = size + len(embeddings)
+        buf = self._embedding_buf
+        # Embeddings loaded from disk (a read-only memory map) have no buffer yet
+        if buf is None or needed > len(buf):
+            capacity = 0 if buf is None else len(buf)
+            buf = np.empty((max(2 * capacity, needed), self.dimension), dtype=self._storage_dtype)
+            if size:
+                buf[:size] = self.embeddings
+            self._embedding_buf = buf
+        buf[size:needed] = embeddings
+        self.embeddings = buf[:needed]
+
+    def _new_flat_index(self):
+        """Empty exact inner-product index (cosine similarity on normalized vectors), fp16 if half_precision."""
+        if self.half_precision:
+            return faiss.IndexScalarQuantizer(self.dimension, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT)
+        return faiss.IndexFlatIP(self.dimension)
+
+    @property
+    def _storage_dtype(self):
+        """dtype of the NumPy fallback embedding matrix."""
+        return np.float16 if self.half_precision else np.float32
+
+    def _set_nprobe(self):
+        """Apply the configured nprobe when the index is an IVF index."""
+        if hasattr(self.index, 'nprobe'):
+            self.index.nprobe = self.nprobe
+
+    # A policy starts with its number, e.g. "1.", "2.". Matched per streamed line: one
+    # finditer over the whole text is no faster for short policy lines and needs the file in memory
+    _POLICY_RE = re.compile(r'^(\d+)\.')
+
+    def _split_policies(self, lines: Iterable[str]) -> List[Dict]:
+        """Split policy lines (e.g. an open file) into meaningful chunks."""
+        chunks = []
+
+        # Lines of the current policy, joined once when the policy ends
+        current_parts = []
         policy_number = 0
-        
+
+        def add_chunk():
+            text = " ".join(current_parts)
+            chunks.append({
+                'text': text,
+                'policy_number': policy_number,
+                'category': self._categorize_lowered(text.lower())
+            })
+
         for line in lines:
             line = line.strip()
             if not line:
                 continue
             
             # Check if this is a policy number (e.g., "1.", "2.", etc.)
-            if re.match(r'^\d+\.', line):
+            match = self._POLICY_RE.match(line)
+            if match:
                 # Save previous chunk if exists
-                if current_chunk:
-                    chunks.append({
-                        'text': current_chunk.strip(),
-                        'policy_number': policy_number,
-                        'category': self._categorize_policy(current_chunk)
-                    })
+                if current_parts:
+                    add_chunk()
                 
                 # Start new chunk
-                policy_number = int(line.split('.')[0])
-                current_chunk = line
+                policy_number = int(match.group(1))
+                current_parts = [line]
             else:
                 # Add to current chunk
-                current_chunk += " " + line
+                current_parts.append(line)
         
         # Add the last chunk
-        if current_chunk:
-            chunks.append({
-                'text': current_chunk.strip(),
-                'policy_number': policy_number,
-                'category': self._categorize_policy(current_chunk)
-            })
+        if current_parts:
+            add_chunk()
         
         return chunks
     
+    # Keyword patterns in priority order; the first category with any keyword in the text wins.
+    # Matched against lowercased text: case-sensitive scans are several times faster than IGNORECASE
+    _CATEGORY_PATTERNS = [
+        (re.compile(r'workload|hours|teaching'), "workload_management"),
+        (re.compile(r'schedule|time|slot|break'), "scheduling"),
+        (re.compile(r'department|distribute|staff'), "department_management"),
+        (re.compile(r'research|administrative|mentoring'), "faculty_development"),
+    ]
+
     def _categorize_policy(self, policy_text: str) -> str:
         """Categorize policy based on content."""
-        text_lower = policy_text.lower()
-        
-        if any(word in text_lower for word in ['workload', 'hours', 'teaching']):
-            return "workload_management"
-        elif any(word in text_lower for word in ['schedule', 'time', 'slot', 'break']):
-            return "scheduling"
-        elif any(word in text_lower for word in ['department', 'distribute', 'staff']):
-            return "department_management"
-        elif any(word in text_lower for word in ['research', 'administrative', 'mentoring']):
-            return "faculty_development"
-        else:
-            return "general"
+        return self._categorize_lowered(policy_text.lower())
+
+    def _categorize_lowered(self, text_lower: str) -> str:
+        """Categorize already-lowercased policy text."""
+        for pattern, category in self._CATEGORY_PATTERNS:
+            if pattern.search(text_lower):
+                return category
+        return "general"
     
-    def search_policies(self, query: str, n_results: int = 3) -> List[Dict]:
-        """Search for relevant policies based on query."""
-        try:
-            # Create a simple query embedding (random for demo)
-            query_embedding = np.random.rand(1, self.dimension).astype('float32')
-            self._normalize_inplace(query_embedding)
+    def embed_query(self, query: str) -> np.ndarray:
+        """Embed a query as a normalized (1, dimension) float32 matrix."""
+        query_embedding = np.ascontiguousarray(self._embedder.encode(query), dtype='float32').reshape(1, self.dimension)
+        if HAS_FAISS:
+            faiss.normalize_L2(query_embedding)
+        else:
+            self._normalize_vec(query_embedding[0])
+        return query_embedding
 
-            policy_results = []
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Embed several queries in one call as a normalized (len(queries), dimension) matrix."""
+        query_embeddings = np.asarray(self._embedder.encode(list(queries)), dtype='float32').reshape(len(queries), self.dimension)
+        self._normalize_inplace(query_embeddings)
+        return query_embeddings
+
+    def search_policies(self, query: str, n_results: int = 3, query_embedding: Optional[np.ndarray] = None) -> List[Dict]:
+        """Search for relevant policies based on query.
+
+        A precomputed, normalized query_embedding may be passed to skip embedding.
+        """
+        try:
+            if query_embedding is None:
+                query_embedding = self.embed_query(query)
 
             if HAS_FAISS:
                 scores, indices = self.index.search(query_embedding, n_results)
-                for score, idx in zip(scores[0], indices[0]):
-                    if 0 <= idx < len(self.metadata):
-                        policy_results.append({
-                            'text': self.metadata[idx]['text'],
-                            'metadata': self.metadata[idx],
-                            'distance': float(score)
-                        })
+                return self._build_results(scores[0], indices[0])
             else:
                 if self.embeddings is None or len(self.metadata) == 0:
                     return []
                 # Cosine similarity via dot product (embeddings already normalized)
-                sims = (self.embeddings @ query_embedding.T).ravel()
-                top_indices = np.argsort(-sims)[:n_results]
-                for idx in top_indices:
-                    if 0 <= idx < len(self.metadata):
-                        policy_results.append({
-                            'text': self.metadata[idx]['text'],
-                            'metadata': self.metadata[idx],
-                            'distance': float(sims[idx])
-                        })
-
-            return policy_results
+                if HAS_NUMBA and self.embeddings.dtype == np.float32:
+                    scores, top_indices = _search_topk(np.asarray(self.embeddings), query_embedding[0], n_results)
+                    return self._build_results(scores, top_indices)
+                sims = self._similarities(np.ascontiguousarray(query_embedding[0]))
+                top_indices = self._top_k(sims[None, :], n_results)[0]
+                return self._build_results(sims[top_indices], top_indices)
             
         except Exception as e:
             print(f"Error searching policies: {e}")
             return []
+
+    def search_policies_batch(self, queries: List[str], n_results: int = 3) -> List[List[Dict]]:
+        """Search policies for several queries with one embedding call and one index search.
+
+        FAISS splits the batch across FAISS_THREADS threads; the NumPy fallback
+        scores it with a single matrix product. Returns one result list per
+        query, in the same order as queries.
+        """
+        try:
+            if not queries:
+                return []
+            query_embeddings = self.embed_queries(queries)
+
+            if HAS_FAISS:
+                scores, indices = self.index.search(query_embeddings, n_results)
+            else:
+                if self.embeddings is None or len(self.metadata) == 0:
+                    return [[] for _ in queries]
+                # One (queries x policies) similarity matrix for the whole batch
+                sims = self._similarities(query_embeddings)
+                indices = self._top_k(sims, n_results)
+                scores = np.take_along_axis(sims, indices, axis=1)
+
+            return [self._build_results(row_scores, row_indices) for row_scores, row_indices in zip(scores, indices)]
+
+        except Exception as e:
+            print(f"Error searching policies: {e}")
+            return [[] for _ in queries]
+
+    def _similarities(self, query_embeddings: np.ndarray) -> np.ndarray:
+        """Dot products against the NumPy fallback embeddings.
+
+        A single (dimension,) query gives (policies,) scores through BLAS gemv; a
+        (queries, dimension) batch gives a (queries, policies) matrix through gemm.
+        float16 rows are upcast one block at a time: NumPy has no fast float16
+        matmul, and a block keeps the float32 copy small.
+        """
+        if self.embeddings.dtype == np.float32:
+            return self.embeddings.dot(query_embeddings) if query_embeddings.ndim == 1 else query_embeddings @ self.embeddings.T
+        n = len(self.embeddings)
+        sims = np.empty(query_embeddings.shape[:-1] + (n,), dtype=np.float32)
+        for start in range(0, n, _UPCAST_BLOCK):
+            block = np.asarray(self.embeddings[start:start + _UPCAST_BLOCK], dtype=np.float32)
+            sims[..., start:start + len(block)] = query_embeddings @ block.T
+        return sims
+
+    @staticmethod
+    def _top_k(sims: np.ndarray, k: int) -> np.ndarray:
+        """Column indices of the k largest scores in each row, best first.
+
+        argpartition selects the k candidates in linear time; only those k are sorted.
+        """
+        n = sims.shape[1]
+        k = min(k, n)
+        if k <= 0:
+            return np.empty((sims.shape[0], 0), dtype=np.intp)
+        if k < n:
+            candidates = np.argpartition(sims, n - k, axis=1)[:, n - k:]
+        else:
+            candidates = np.broadcast_to(np.arange(n), sims.shape)
+        order = np.argsort(np.take_along_axis(sims, candidates, axis=1), axis=1)[:, ::-1]
+        return np.take_along_axis(candidates, order, axis=1)
+
+    def _build_results(self, scores: np.ndarray, indices: np.ndarray) -> List[Dict]:
+        """Turn index hits into result dicts, skipping invalid (e.g. -1) indices."""
+        policy_results = []
+        for score, idx in zip(scores, indices):
+            if 0 <= idx < len(self.metadata):
+                metadata = self.metadata[idx]
+                policy_results.append({
+                    'text': metadata['text'],
+                    'metadata': metadata,
+                    'distance': float(score)
+                })
+        return policy_results
     
+    def _index_categories(self, start: int, metadatas: Optional[List[Dict]] = None):
+        """Add metadata entries (self.metadata by default) at positions from start to the category index."""
+        if metadatas is None:
+            metadatas = self.metadata[start:]
+        for i, metadata in enumerate(metadatas, start):
+            self._by_category[metadata.get('category')].append(i)
+
     def get_policy_by_category(self, category: str) -> List[Dict]:
         """Get all policies in a specific category."""
         try:
-            # Filter metadata by category
-            category_policies = []
-            for i, metadata in enumerate(self.metadata):
-                if metadata.get('category') == category:
-                    category_policies.append({
-                        'text': metadata['text'],
-                        'metadata': metadata,
-                        'distance': 1.0  # No distance for category filter
-                    })
-            return category_policies
+            # Positions come from the category index; no distance for a category filter
+            return [
+                {'text': metadata['text'], 'metadata': metadata, 'distance': 1.0}
+                for metadata in map(self.metadata.__getitem__, self._by_category.get(category, ()))
+            ]
             
         except Exception as e:
             print(f"Error getting policies by category: {e}")
@@ -234,10 +587,16 @@ class PolicyVectorStore:
         """Clear all policies from the collection."""
         try:
             if HAS_FAISS:
-                self.index = faiss.IndexFlatIP(self.dimension)
+                self.index = self._new_flat_index()
+                self._index_mapped = False
             else:
-                self.embeddings = np.zeros((0, self.dimension), dtype='float32')
-            self.metadata = []
+                self.embeddings = np.zeros((0, self.dimension), dtype=self._storage_dtype)
+                self._embedding_buf = None
+            self.metadata = PolicyMetadata()
+            # Truncate the logs on the next save
+            self._saved_metadata = self._saved_rows = 0
+            self._by_category.clear()
+            self.query_cache.clear()
             self._save_index()
             print("Collection cleared successfully")
             return True
@@ -257,24 +616,189 @@ class PolicyVectorStore:
             return {"error": f"Error getting collection info: {e}"}
     
     def _save_index(self):
-        """Save the vector index/embeddings and metadata to disk."""
+        """Save the vector index/embeddings and metadata to disk.
+
+        Metadata and NumPy embeddings are append-only logs, so a save writes only
+        the records added since the previous one. FAISS has no appendable file
+        format; its index is still written whole.
+        """
         try:
-            with open(self.metadata_path, 'wb') as f:
-                pickle.dump(self.metadata, f)
+            def write_metadata(path, start, mode):
+                # Pickles are appended one batch after another; _load_metadata reads them all
+                with open(path, mode) as f:
+                    pickle.dump(self.metadata[start:], f)
+
+            def write_embeddings(path, start, mode):
+                with open(path, mode) as f:
+                    np.ascontiguousarray(self.embeddings[start:], dtype=self._storage_dtype).tofile(f)
+
+            if HAS_PYARROW:
+                self._write_log(self.metadata_arrow_path, self._saved_metadata, len(self.metadata), self._write_metadata_arrow)
+            else:
+                self._write_log(self.metadata_path, self._saved_metadata, len(self.metadata), write_metadata)
+            self._saved_metadata = len(self.metadata)
             if HAS_FAISS:
-                faiss.write_index(self.index, self.index_path)
+                self._replace_file(self.index_path, lambda path: faiss.write_index(self.index, path))
             else:
                 if self.embeddings is not None:
-                    np.save(self.embeddings_path, self.embeddings)
+                    self._write_log(self._embeddings_log_path(self._storage_dtype), self._saved_rows,
+                                    len(self.embeddings), write_embeddings)
+                    self._saved_rows = len(self.embeddings)
         except Exception as e:
             print(f"Error saving index: {e}")
 
+    def _write_log(self, path: str, saved: int, total: int, write) -> None:
+        """Append records saved..total to the log at path; with nothing saved yet, replace the whole log."""
+        if saved == 0:
+            self._replace_file(path, lambda tmp_path: write(tmp_path, 0, 'wb'))
+        elif total > saved:
+            write(path, saved, 'ab')
+
+    def _embeddings_log_path(self, dtype) -> str:
+        """Raw row-major embeddings log for the NumPy fallback; the row count follows from the file size."""
+        return os.path.join(self.persist_directory, f"{self.collection_name}_embeddings.{np.dtype(dtype).name}")
+
+    def _load_embeddings(self) -> Optional[np.ndarray]:
+        """Memory-map the NumPy fallback embeddings log, or the legacy .npy snapshot; None if neither exists."""
+        other_dtype = np.float32 if self.half_precision else np.float16
+        for dtype in (self._storage_dtype, other_dtype):
+            path = self._embeddings_log_path(dtype)
+            if os.path.exists(path):
+                rows = os.path.getsize(path) // (self.dimension * np.dtype(dtype).itemsize)
+                if rows == 0:
+                    return np.zeros((0, self.dimension), dtype=self._storage_dtype)
+                # Read-only memory map; searches stream through it and adds copy it into a writable buffer
+                embeddings = np.memmap(path, dtype=dtype, mode='r', shape=(rows, self.dimension))
+                # A log in the other precision is rewritten in this store's precision on the next save
+                self._saved_rows = rows if dtype == self._storage_dtype else 0
+                return embeddings
+        if os.path.exists(self.embeddings_path):
+            return np.load(self.embeddings_path, mmap_mode='r')
+        return None
+
+    def _has_saved_metadata(self) -> bool:
+        """Whether metadata was persisted in either the Arrow or the pickle format."""
+        return (HAS_PYARROW and os.path.exists(self.metadata_arrow_path)) or os.path.exists(self.metadata_path)
+
+    def _load_metadata(self) -> List[Dict]:
+        """Load metadata from the Arrow log, or from the pickle log if that is all there is.
+
+        Records come back in save order. A pickle log read while pyarrow is
+        available is migrated to the Arrow log on the next save.
+        """
+        metadata = []
+        if HAS_PYARROW and os.path.exists(self.metadata_arrow_path):
+            # One Arrow IPC stream per save, back to back
+            with pa.memory_map(self.metadata_arrow_path, 'r') as source:
+                size = source.size()
+                while source.tell() < size:
+                    metadata.extend(pa.ipc.open_stream(source).read_all().to_pylist())
+            self._saved_metadata = len(metadata)
+            return metadata
+        with open(self.metadata_path, 'rb') as f:
+            while True:
+                try:
+                    metadata.extend(pickle.load(f))
+                except EOFError:
+                    break
+        self._saved_metadata = 0 if HAS_PYARROW else len(metadata)
+        return metadata
+
+    def _write_metadata_arrow(self, path: str, start: int, mode: str) -> None:
+        """Write metadata from start on as one Arrow IPC stream; category and source are dictionary-encoded."""
+        metadata = self.metadata[start:]
+        table = pa.table({
+            'policy_number': pa.array([m['policy_number'] for m in metadata], type=pa.int32()),
+            'category': pa.array([m['category'] for m in metadata], type=pa.string()).dictionary_encode(),
+            'source': pa.array([m['source'] for m in metadata], type=pa.string()).dictionary_encode(),
+            'text': pa.array([m['text'] for m in metadata], type=pa.large_string()),
+        })
+        with pa.OSFile(path, mode) as sink:
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+
+    @staticmethod
+    def _replace_file(path: str, write) -> None:
+        """Write to a temporary file, then rename it over path.
+
+        Files are memory-mapped on load, so they must be replaced rather than
+        truncated in place under a live mapping.
+        """
+        tmp_path = path + '.tmp'
+        write(tmp_path)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _normalize_vec(vec: np.ndarray) -> None:
+        """L2-normalize a single vector in-place; skips the row-norm array of _normalize_inplace."""
+        norm = math.sqrt(float(np.dot(vec, vec)))
+        vec /= (norm or 1.0)
+
     @staticmethod
     def _normalize_inplace(mat: np.ndarray) -> None:
         """L2-normalize rows of a matrix in-place for cosine similarity."""
-        norms = np.linalg.norm(mat, axis=1, keepdims=True)
+        if HAS_FAISS and mat.dtype == np.float32 and mat.flags.c_contiguous:
+            # SIMD C++ kernel; like the NumPy path it leaves all-zero rows untouched
+            faiss.normalize_L2(mat)
+            return
+        # Row-wise dot products in one pass, then sqrt in place
+        norms = np.einsum('ij,ij->i', mat, mat)
+        np.sqrt(norms, out=norms)
         norms[norms == 0] = 1.0
-        mat /= norms
+        mat /= norms[:, None]
+
+class PolicyQueryCache:
+    """Approximate LRU cache in front of PolicyVectorStore.search_policies.
+
+    Cached entries are keyed by query embedding; a new query whose cosine
+    similarity with a cached query reaches the threshold reuses its results
+    instead of searching the index again.
+    """
+
+    def __init__(self, vector_store: PolicyVectorStore, threshold: float = 0.95, capacity: int = 512):
+        self.vector_store = vector_store
+        self.threshold = threshold
+        self.capacity = capacity
+        self._keys = np.zeros((capacity, vector_store.dimension), dtype='float32')
+        self._entries = []  # (n_results, results) per slot, parallel to _keys
+        self._lru = OrderedDict()  # slot -> None, least recently used first
+        self._lock = threading.Lock()  # tools may be called from concurrent sessions
+
+    def search(self, query: str, n_results: int = 3) -> List[Dict]:
+        """Return cached results for a near-duplicate query, else search and cache."""
+        query_embedding = self.vector_store.embed_query(query)
+
+        with self._lock:
+            size = len(self._entries)
+            if size:
+                scores = self._keys[:size] @ query_embedding[0]
+                best = int(np.argmax(scores))
+                cached_n, cached_results = self._entries[best]
+                if scores[best] >= self.threshold and cached_n == n_results:
+                    self._lru.move_to_end(best)
+                    return cached_results
+
+        results = self.vector_store.search_policies(query, n_results=n_results, query_embedding=query_embedding)
+        if results:
+            with self._lock:
+                self._insert(query_embedding[0], n_results, results)
+        return results
+
+    def clear(self):
+        """Drop all cached entries."""
+        with self._lock:
+            self._entries = []
+            self._lru.clear()
+
+    def _insert(self, key: np.ndarray, n_results: int, results: List[Dict]):
+        if len(self._entries) < self.capacity:
+            slot = len(self._entries)
+            self._entries.append((n_results, results))
+        else:
+            slot, _ = self._lru.popitem(last=False)
+            self._entries[slot] = (n_results, results)
+        self._keys[slot] = key
+        self._lru[slot] = None
 
 # Example usage and testing
 if __name__ == "__main__":